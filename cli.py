@@ -1,11 +1,22 @@
 import utilities
+import os
 import time
 import click
 import logging
-import multiprocessing
 import traceback
 import logging
 import subprocess
+import query_api
+import query_cache
+import source_cache
+import header_index
+import include_graph
+import scheduler
+import sysroot_index
+import manifest
+import syscall_matrix
+import result_store
+import query_sys
 # from edit_etc_profile import editing_etc_profile
 
 # Get the logger
@@ -23,7 +34,47 @@ logger.addHandler(handler)
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
-@click.command(context_settings=CONTEXT_SETTINGS)
+class DefaultCommandGroup(click.Group):
+    def __init__(self, *args, default_command=None, **kwargs):
+        """
+        A group that passes options given without a command to a default
+        command, so invocations written before the commands were grouped,
+        i.e ./query_sys.py --mrepo=./repos ..., keep working.
+
+        Args:
+            default_command (str): The command the options are passed to.
+        """
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if (
+            args
+            and args[0].startswith("-")
+            and args[0] not in ctx.help_option_names
+            and self.default_command is not None
+        ):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(
+    cls=DefaultCommandGroup, default_command="run", context_settings=CONTEXT_SETTINGS
+)
+def main():
+    """
+    Extracts the system calls and the API calls of C/C++ repositories, and
+    answers questions about the results. Options given without a command are
+    passed to run.
+
+    \b
+    Example usage:
+        --$ ./query_sys.py run --output=./output --mrepo=./repos --compiler=/usr/include/ --version=v1
+        --$ ./query_sys.py query --matrix ./output users openat
+    """
+
+
+@main.command(context_settings=CONTEXT_SETTINGS)
 @click.option(
     "--mrepo",
     required=True,
@@ -45,7 +96,7 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     required=True,
     type=str,
     show_default=True,
-    help="[Required] the version of the source code, that is being refrenced against i.e gcc, libc. This option is mandatory.",
+    help="[Required] the version of the source code, that is being refrenced against i.e gcc, libc. A comma separated list resolves the API calls against each version. This option is mandatory.",
 )
 @click.option(
     "--output",
@@ -61,6 +112,14 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     help="Use --no-echo to suppress output.",
 )
 @click.option("--t", is_flag=True, default=False, help="Activates multiprocessing.")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="Worker processes analysing the files, one pool shared by every repository of the run.",
+)
 @click.option(
     "--dev-echo",
     is_flag=True,
@@ -82,7 +141,125 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     default=False,
     help="Extracting all the systemc call from your source code",
 )
-def run(mrepo, echo, t, dev_echo, output, compiler, api, sys, version) -> dict:
+@click.option(
+    "--query-cache/--no-query-cache",
+    "use_query_cache",
+    default=True,
+    help="Answer repeated Elixir identifier queries from a persistent cache.",
+)
+@click.option(
+    "--query-cache-path",
+    type=str,
+    default=query_cache.DEFAULT_CACHE_PATH,
+    show_default=True,
+    help="Location of the persistent Elixir query cache.",
+)
+@click.option(
+    "--query-jobs",
+    type=click.IntRange(min=1),
+    default=query_api.DEFAULT_QUERY_JOBS,
+    show_default=True,
+    help="Maximum number of Elixir identifier queries running concurrently.",
+)
+@click.option(
+    "--query-backend",
+    type=click.Choice(sorted(query_api.QUERY_BACKENDS)),
+    default="shell",
+    show_default=True,
+    help="How identifiers are resolved: one query.py per identifier (shell), long-lived Elixir workers (worker) or reading $LXR_DATA_DIR directly (data).",
+)
+@click.option(
+    "--api-identifiers",
+    type=click.Choice(query_api.IDENTIFIER_MODES),
+    default="all",
+    show_default=True,
+    help="Identifiers sent to Elixir: every name (all), names in call position (calls) or calls and declared functions (declarations). The last two skip functions defined in the repo.",
+)
+@click.option(
+    "--keep-api-output",
+    is_flag=True,
+    default=False,
+    help="Also write the filtered raw Elixir output next to filtered_api_calls.json.",
+)
+@click.option(
+    "--source-mmap",
+    is_flag=True,
+    default=False,
+    help="Memory-map the source files instead of reading them.",
+)
+@click.option(
+    "-I",
+    "--include-dir",
+    "include_dirs",
+    multiple=True,
+    type=click.Path(exists=True),
+    help="Additional include directory searched before --compiler, may be repeated.",
+)
+@click.option(
+    "--header-cache-path",
+    type=str,
+    default=header_index.DEFAULT_INDEX_PATH,
+    show_default=True,
+    help="Location of the persistent cache of header identifiers.",
+)
+@click.option(
+    "--sysroot-index",
+    "sysroot_index_path",
+    type=click.Path(exists=True),
+    default=None,
+    help="Sysroot index written by index-sysroot, answers the --compiler headers without reading them.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Only reprocess the files changed since the previous run of each repo.",
+)
+@click.option(
+    "--manifest-dir",
+    type=str,
+    default=manifest.DEFAULT_MANIFEST_DIR,
+    show_default=True,
+    help="Directory of the per-repo manifests used by --incremental.",
+)
+@click.option(
+    "--text-reports/--no-text-reports",
+    default=True,
+    help="Also render the results as the pprint text reports next to the JSON Lines file.",
+)
+@click.option(
+    "--result-store",
+    "result_store_path",
+    type=str,
+    default=None,
+    help=f"Also write the results into an indexed SQLite store, i.e {result_store.DEFAULT_STORE_PATH}, see query.",
+)
+def run(
+    mrepo,
+    echo,
+    t,
+    jobs,
+    dev_echo,
+    output,
+    compiler,
+    api,
+    sys,
+    version,
+    use_query_cache,
+    query_cache_path,
+    query_jobs,
+    query_backend,
+    api_identifiers,
+    keep_api_output,
+    source_mmap,
+    include_dirs,
+    header_cache_path,
+    sysroot_index_path,
+    incremental,
+    manifest_dir,
+    text_reports,
+    result_store_path,
+) -> dict:
     """
     Analyzes a software repository with various options. You need to specify
     the relative path of the repository to be analyzed and the output directory.
@@ -110,17 +287,67 @@ def run(mrepo, echo, t, dev_echo, output, compiler, api, sys, version) -> dict:
         --dev-echo: Echo debugging information for debugging purposes.
         --show-c-cpp: Echo the names of all the C or C++ files to be analyzed by syscall hunter in this instance.
         --compiler: Choose the location where the syscall-hunter will look for header files (spd: QNX, spk: GNU/Linux).
-        --t: activate multiprocessing.
+        --t: activate multiprocessing, repos run largest first with their files spread over --jobs workers.
+        -j/--jobs: Worker processes analysing the files, one pool shared by every repository of the run.
         --api: Extracting all the api call from your source code
+        --version: Version(s) the API calls are resolved against, i.e v1,v2 writes filtered_api_calls.json per version and api_calls_diff.json.
+        --query-cache: Reuse Elixir query results across repos and runs (use --no-query-cache to disable).
+        --query-cache-path: Location of the persistent Elixir query cache.
+        --query-jobs: Maximum number of Elixir identifier queries running concurrently.
+        --query-backend: How identifiers are resolved against the Elixir index (shell, worker, data).
+        --api-identifiers: Which identifiers are sent to Elixir (all, calls, declarations).
+        --keep-api-output: Also write the filtered raw Elixir output, api_output_<repo>.txt.
+        --source-mmap: Memory-map the source files instead of reading them.
+        -I/--include-dir: Additional include directory searched before --compiler, may be repeated.
+        --header-cache-path: Location of the persistent cache of header identifiers.
+        --sysroot-index: Prebuilt index of the --compiler headers, see index-sysroot.
+        --incremental: Reuse the per-file results of unchanged files from the previous run.
+        --manifest-dir: Directory of the per-repo manifests used by --incremental.
+        --text-reports: Render the text reports next to results_<repo>.jsonl (use --no-text-reports to skip them).
+        --result-store: SQLite store the results of every repo are added to, queried with query.
     \b
     Returns:
         --A files containing the results of the analysis, the f/opt/rta-vrte-linux/3.8.0/sysroots/aarch64-boschdenso-linux/usr/include/
     \b
     Example usage:
-        --$ ./query_api.py  --output=/relative/path//output --mrepo=/relative/path/repo --compiler=/relative/path/compiler [options]
+        --$ ./query_sys.py run --output=/relative/path//output --mrepo=/relative/path/repo --compiler=/relative/path/compiler [options]
     """
     start_time = time.time()  # Record the start time
+    api_options = {
+        "cache_path": query_cache_path if use_query_cache else None,
+        "jobs": query_jobs,
+        "backend": query_backend,
+        "keep_api_output": keep_api_output,
+        "identifier_mode": api_identifiers,
+    }
+    source_options = {"use_mmap": source_mmap}
+    sys_options = {
+        "include_dirs": include_dirs,
+        "header_cache_path": header_cache_path,
+        "sysroot_index": sysroot_index_path,
+        "text_reports": text_reports,
+        "result_store": result_store_path,
+    }
+    manifest_dir = manifest_dir if incremental else None
+    if api and query_backend == "data" and not os.path.isdir(
+        os.environ.get("LXR_DATA_DIR", "")
+    ):
+        raise click.BadParameter(
+            "the data backend reads the Elixir databases of $LXR_DATA_DIR, set it to the data directory of the project.",
+            param_hint="--query-backend",
+        )
+    if result_store_path:
+        # Refuses a store of a newer format before any repository is analysed
+        try:
+            result_store.ResultStore(result_store_path).close()
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="--result-store")
+    versions = [name for name in version.replace(",", " ").split()]
+    matrix = syscall_matrix.SyscallMatrix(utilities.x86_64_syscall_ids())
     try:
+        if sysroot_index_path:
+            # Loaded before the pool is created so the workers inherit it
+            sysroot_index.load_sysroot_index(sysroot_index_path)
         utilities.clear_or_create_directory(output)
         repo_list = utilities.setup_repository_list(mrepo)
 
@@ -134,18 +361,54 @@ def run(mrepo, echo, t, dev_echo, output, compiler, api, sys, version) -> dict:
             "\n* Running a multiprocess instance will speed up the analysis, but will distort the standard output.\n"
             "  This will not affect the output files. Do you want to continue?"
         ):
-            with multiprocessing.Pool() as pool:
-                pool.starmap(
-                    utilities.repo_analyse,
-                    [
-                        (repo_name, mrepo, echo, dev_echo, output, compiler, api, version)
-                        for repo_name in repo_list
-                    ],
+
+            def analyse(repo_name, shared_pool):
+                utilities.repo_analyse(
+                    repo_name,
+                    mrepo,
+                    echo,
+                    dev_echo,
+                    output,
+                    compiler,
+                    api,
+                    versions,
+                    api_options,
+                    source_options,
+                    sys_options,
+                    manifest_dir,
+                    shared_pool,
+                    matrix,
                 )
+
+            scheduler.run_repos(repo_list, mrepo, analyse, jobs)
         else:
-            for repo_name in repo_list:
-                utilities.repo_analyse(
-                    repo_name, mrepo, echo, dev_echo, output, compiler, api, version)
+            # One pool for the whole run, every repository reuses its workers
+            shared_pool = scheduler.SharedPool(jobs) if jobs > 1 else None
+            try:
+                for repo_name in repo_list:
+                    utilities.repo_analyse(
+                        repo_name,
+                        mrepo,
+                        echo,
+                        dev_echo,
+                        output,
+                        compiler,
+                        api,
+                        versions,
+                        api_options,
+                        source_options,
+                        sys_options,
+                        manifest_dir,
+                        shared_pool,
+                        matrix,
+                    )
+            finally:
+                if shared_pool is not None:
+                    shared_pool.close()
+
+        matrix_path = os.path.join(output, syscall_matrix.MATRIX_FILE)
+        matrix.save(matrix_path)
+        print(f"* Syscall matrix of {len(matrix.repos())} repos written to {matrix_path}")
 
     except Exception as e:
         logger.error(
@@ -157,6 +420,347 @@ def run(mrepo, echo, t, dev_echo, output, compiler, api, sys, version) -> dict:
     print(f"INFO: Exiting...\nTime elapsed: {execution_time} seconds.")
 
 
+@main.group(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--matrix",
+    "matrix_path",
+    type=click.Path(exists=True),
+    help=f"The {syscall_matrix.MATRIX_FILE} of a run, or the output directory containing it. Read by users, diff, common, syscalls and counts.",
+)
+@click.option(
+    "--store",
+    "store_path",
+    type=click.Path(dir_okay=False),
+    default=result_store.DEFAULT_STORE_PATH,
+    show_default=True,
+    help="The result store written by run --result-store. Read by lines, headers, reachable and api.",
+)
+@click.pass_context
+def query(ctx, matrix_path, store_path):
+    """
+    Answers questions about the results of previous runs. Which repositories or
+    files use a syscall, and how repositories differ, is answered from the
+    syscall matrix every run writes; where a syscall is called, declared or
+    reached, and who calls an API symbol, from the result store.
+
+    \b
+    Example usage:
+        --$ ./query_sys.py query --matrix ./output users openat
+        --$ ./query_sys.py query --store results.sqlite lines openat
+    """
+    start_time = time.time()
+    ctx.obj = {"matrix_path": matrix_path, "store_path": store_path}
+    ctx.call_on_close(
+        lambda: click.echo(
+            f"* Answered in {(time.time() - start_time) * 1000:.1f} ms", err=True
+        )
+    )
+
+
+def open_matrix(paths):
+    """
+    Args:
+        paths (dict): The --matrix and --store of the query group.
+
+    Returns:
+        SyscallMatrix: The matrix of --matrix.
+    """
+    matrix_path = paths["matrix_path"]
+    if matrix_path is None:
+        raise click.BadParameter("this query reads the syscall matrix of a run", param_hint="--matrix")
+    if os.path.isdir(matrix_path):
+        matrix_path = os.path.join(matrix_path, syscall_matrix.MATRIX_FILE)
+    return syscall_matrix.load_matrix(matrix_path)
+
+
+def open_store(paths):
+    """
+    Opens the result store of --store, it is closed with the query.
+
+    Args:
+        paths (dict): The --matrix and --store of the query group.
+
+    Returns:
+        ResultStore: The store.
+    """
+    if not os.path.isfile(paths["store_path"]):
+        raise click.BadParameter(
+            f"{paths['store_path']} does not exist, write it with run --result-store",
+            param_hint="--store",
+        )
+    try:
+        store = result_store.ResultStore(paths["store_path"])
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--store")
+    click.get_current_context().call_on_close(store.close)
+    return store
+
+
+def repo_bits(matrix, repo):
+    """
+    Args:
+        matrix (SyscallMatrix): The loaded matrix.
+        repo (str): The name of a repository.
+
+    Returns:
+        int: The bitset of the repository.
+    """
+    try:
+        return matrix.row(repo)
+    except KeyError:
+        raise click.BadParameter(f"{repo} is not in the matrix", param_hint="REPO")
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("syscalls", nargs=-1, required=True)
+@click.option("--files", is_flag=True, help="List the files instead of the repositories.")
+@click.pass_obj
+def users(paths, syscalls, files):
+    """
+    Lists the repositories (or files) using every given syscall.
+    """
+    matrix = open_matrix(paths)
+    unknown = matrix.unknown(syscalls)
+    if unknown:
+        raise click.BadParameter(
+            f"unknown syscalls {', '.join(unknown)}", param_hint="SYSCALLS"
+        )
+    for repo, file_path in matrix.users(syscalls, files):
+        print(f"{repo}/{file_path}" if files else repo)
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("repo")
+@click.argument("other")
+@click.pass_obj
+def diff(paths, repo, other):
+    """
+    Lists the syscalls REPO uses that OTHER does not.
+    """
+    matrix = open_matrix(paths)
+    for syscall in matrix.syscalls(repo_bits(matrix, repo) & ~repo_bits(matrix, other)):
+        print(syscall)
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("repos", nargs=-1, required=True)
+@click.pass_obj
+def common(paths, repos):
+    """
+    Lists the syscalls used by all the given repositories.
+    """
+    matrix = open_matrix(paths)
+    bits = repo_bits(matrix, repos[0])
+    for repo in repos[1:]:
+        bits &= repo_bits(matrix, repo)
+    for syscall in matrix.syscalls(bits):
+        print(syscall)
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("repo")
+@click.option("--file", "file_path", help="A file of the repository, relative to it.")
+@click.pass_obj
+def syscalls(paths, repo, file_path):
+    """
+    Lists the syscalls used by a repository, or by one of its files.
+    """
+    matrix = open_matrix(paths)
+    if file_path is None:
+        bits = repo_bits(matrix, repo)
+    elif (repo, file_path) in matrix.index:
+        bits = matrix.row(repo, file_path)
+    else:
+        raise click.BadParameter(f"{file_path} is not in {repo}", param_hint="--file")
+    for syscall in matrix.syscalls(bits):
+        print(syscall)
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.pass_obj
+def counts(paths):
+    """
+    Lists how many repositories use each syscall, most used first.
+    """
+    matrix = open_matrix(paths)
+    repos = [matrix.row(repo) for repo in matrix.repos()]
+    totals = {
+        syscall: sum(bits >> number & 1 for bits in repos)
+        for syscall, number in matrix.ids.items()
+    }
+    for syscall, total in sorted(totals.items(), key=lambda item: (-item[1], item[0])):
+        if total:
+            print(f"{syscall} {total}")
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("syscall")
+@click.option("--repo", help="Only answer for this repository.")
+@click.pass_obj
+def lines(paths, syscall, repo):
+    """
+    Lists the lines calling the syscall.
+    """
+    for repo_name, file_path, line, text in open_store(paths).line_hits(syscall, repo):
+        print(f"{repo_name} {file_path}:{line}: {text}")
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("syscall")
+@click.option("--repo", help="Only answer for this repository.")
+@click.pass_obj
+def headers(paths, syscall, repo):
+    """
+    Lists the headers mentioning the syscall.
+    """
+    for repo_name, header in open_store(paths).headers_of(syscall, repo):
+        print(f"{repo_name} {header}")
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("syscall")
+@click.option("--repo", help="Only answer for this repository.")
+@click.pass_obj
+def reachable(paths, syscall, repo):
+    """
+    Lists the files reaching the syscall through their includes.
+    """
+    for repo_name, file_path in open_store(paths).files_using(syscall, repo, True):
+        print(f"{repo_name} {file_path}")
+
+
+@query.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("symbol")
+@click.option("--repo", help="Only answer for this repository.")
+@click.pass_obj
+def api(paths, symbol, repo):
+    """
+    Lists the repositories calling the API symbol, with the versions defining it
+    and its types.
+    """
+    for repo_name, version, symbol_type in open_store(paths).api_symbol(symbol, repo):
+        print(f"{repo_name} {version} {symbol_type}")
+
+
+@main.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--compiler",
+    required=True,
+    type=click.Path(exists=True),
+    help="The sysroot include directory to index, as passed to run.",
+)
+@click.option(
+    "--index",
+    "index_path",
+    required=True,
+    type=str,
+    help="File the index is written to, pass it to run --sysroot-index.",
+)
+@click.option(
+    "-I",
+    "--include-dir",
+    "include_dirs",
+    multiple=True,
+    type=click.Path(exists=True),
+    help="Include directory searched before --compiler, must match the analysis run.",
+)
+@click.option(
+    "--header-cache-path",
+    type=str,
+    default=header_index.DEFAULT_INDEX_PATH,
+    show_default=True,
+    help="Location of the persistent cache of header identifiers.",
+)
+def index_sysroot(compiler, index_path, include_dirs, header_cache_path):
+    """
+    Scans the headers of a sysroot once and writes their include edges and the
+    syscalls they declare, so analysis runs against the same sysroot do not
+    read its headers again.
+    """
+    start_time = time.time()
+    symbol_cache = header_index.HeaderSymbolCache(header_cache_path)
+    try:
+        index = sysroot_index.build_sysroot_index(
+            compiler, utilities.x86_64_syscalls(), include_dirs, symbol_cache
+        )
+    finally:
+        symbol_cache.close()
+    sysroot_index.write_sysroot_index(index, index_path)
+    print(
+        f"* Indexed {len(index['headers'])} headers, {len(index['syscall_headers'])} syscalls declared."
+    )
+    print(f"INFO: Exiting...\nTime elapsed: {time.time() - start_time} seconds.")
+
+
+def scanned_includes(file_path, cache):
+    """
+    Args:
+        file_path (str): The path to the file.
+        cache (SourceCache): The cache holding the file.
+
+    Returns:
+        list: The headers included by the file, as found by the include
+              directive scanner that builds the include graph.
+    """
+    return [
+        header
+        for header, _ in include_graph.scan_include_directives(
+            source_cache.read_lines(file_path, cache)
+        )
+    ]
+
+
+def timed(extractor, sources, cache):
+    """
+    Runs an include extractor over all the sources.
+
+    Args:
+        extractor (callable): scanned_includes, extract_included_headers or its
+            Pygments variant.
+        sources (list): The source files.
+        cache (SourceCache): The cache holding the sources.
+
+    Returns:
+        tuple: The headers found per file and the elapsed time in seconds.
+    """
+    start_time = time.perf_counter()
+    headers = {path: extractor(path, cache) for path in sources}
+    return headers, time.perf_counter() - start_time
+
+
+@main.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("repo", type=click.Path(exists=True))
+def bench_includes(repo):
+    """
+    Compares the streaming include directive scanner, which builds the include
+    graph, against the Pygments lexer on the C/C++ files of REPO. The source
+    scan of the work units is timed too. Files are loaded in memory first so
+    only parsing is timed.
+    """
+    sources = source_cache.discover_sources(repo)
+    cache = source_cache.SourceCache()
+    for path in sources:
+        cache.read_bytes(path)
+
+    scanned, scan_time = timed(scanned_includes, sources, cache)
+    lexed, lex_time = timed(query_sys.extract_included_headers_lexer, sources, cache)
+    source_scanned, source_scan_time = timed(
+        query_sys.extract_included_headers, sources, cache
+    )
+
+    mismatches = [path for path in sources if scanned[path] != lexed[path]]
+    print(f"* {len(sources)} files, {cache.size / 2**20:.1f} MB")
+    print(f"* Pygments lexer:   {lex_time:.3f} seconds")
+    print(f"* Include scanner:  {scan_time:.3f} seconds")
+    print(f"* Speedup:          {lex_time / max(scan_time, 1e-9):.1f}x")
+    print(f"* Source scan:      {source_scan_time:.3f} seconds")
+    print(f"* Files with different results: {len(mismatches)}")
+    for path in mismatches[:10]:
+        print(f"  {path}: lexer {lexed[path]} scanner {scanned[path]}")
+    mismatches = [path for path in sources if source_scanned[path] != lexed[path]]
+    print(f"* Files where the source scan differs: {len(mismatches)}")
+
+
 if __name__ == "__main__":
-    "./query_sys.py  --output=./delete --mrepo=./repos --compiler=/opt/rta-vrte-linux/3.8.0/sysroots/aarch64-boschdenso-linux/usr/include/ --api"
-    cli_output = run()
+    "./query_sys.py run --output=./delete --mrepo=./repos --compiler=/opt/rta-vrte-linux/3.8.0/sysroots/aarch64-boschdenso-linux/usr/include/ --api"
+    main()
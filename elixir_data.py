@@ -0,0 +1,192 @@
+import re
+import os
+import dbm
+from collections import namedtuple
+
+try:
+    from berkeleydb import db as bdb
+except ImportError:
+    try:
+        from bsddb3 import db as bdb
+    except ImportError:
+        bdb = None
+
+Symbol = namedtuple("Symbol", ["path", "line", "type"])
+IdentRecord = namedtuple(
+    "IdentRecord", ["ident", "definitions", "references", "documented"]
+)
+
+DEFLIST_PATTERN = re.compile(rb"(\d*)(\w)(\d*)(\w),?")
+DEF_TYPES = {
+    "c": "config",
+    "d": "define",
+    "e": "enum",
+    "E": "enumerator",
+    "f": "function",
+    "l": "label",
+    "M": "macro",
+    "m": "member",
+    "p": "prototype",
+    "s": "struct",
+    "t": "typedef",
+    "u": "union",
+    "v": "variable",
+    "x": "externvar",
+}
+
+
+def open_database(path):
+    """
+    Opens an Elixir database read-only.
+
+    Berkeley DB files written by Elixir are read through berkeleydb/bsddb3 when
+    installed, any other file is opened with the standard dbm module.
+
+    Args:
+        path (str): The path to the database, i.e <data dir>/definitions.db.
+
+    Returns:
+        object: A mapping-like database supporting get(key).
+    """
+    if bdb is not None and os.path.isfile(path):
+        database = bdb.DB()
+        database.open(path, flags=bdb.DB_RDONLY)
+        return database
+    return dbm.open(path, "r")
+
+
+def parse_deflist(data):
+    """
+    Decodes an entry of definitions.db.
+
+    Args:
+        data (bytes): The raw entry, "<blob><type><line><family>,..." followed by "#<families>".
+
+    Returns:
+        list: (blob id, type, line, family) tuples sorted by blob id and line.
+    """
+    entries = data.split(b"#")[0]
+    return sorted(
+        (
+            int(blob),
+            DEF_TYPES.get(kind.decode(), kind.decode()),
+            int(line),
+            family.decode(),
+        )
+        for blob, kind, line, family in DEFLIST_PATTERN.findall(entries)
+    )
+
+
+def parse_reflist(data):
+    """
+    Decodes an entry of references.db or doccomments.db.
+
+    Args:
+        data (bytes): The raw entry, "<blob>:<lines>:<family>" lines.
+
+    Returns:
+        list: (blob id, lines, family) tuples sorted by blob id.
+    """
+    entries = []
+    for entry in data.split(b"\n"):
+        if entry:
+            blob, lines, family = entry.split(b":")
+            entries.append((int(blob), lines.decode(), family.decode()))
+    return sorted(entries)
+
+
+def parse_pathlist(data):
+    """
+    Decodes an entry of versions.db.
+
+    Args:
+        data (bytes): The raw entry, "<blob> <path>" lines.
+
+    Returns:
+        dict: The path of every blob in the version.
+    """
+    paths = {}
+    for entry in data.split(b"\n"):
+        if entry:
+            blob, path = entry.split(b" ", 1)
+            paths[int(blob)] = path.decode()
+    return paths
+
+
+class ElixirData:
+    def __init__(self, data_dir):
+        """
+        Opens the definitions, references, doc comments and versions databases
+        of an Elixir project.
+
+        Args:
+            data_dir (str): The project data directory, i.e $LXR_DATA_DIR.
+        """
+        self.data_dir = data_dir
+        self.definitions = open_database(os.path.join(data_dir, "definitions.db"))
+        self.references = open_database(os.path.join(data_dir, "references.db"))
+        self.documented = open_database(os.path.join(data_dir, "doccomments.db"))
+        self.versions = open_database(os.path.join(data_dir, "versions.db"))
+        self.version_paths = {}
+
+    def paths(self, version):
+        """
+        Returns the blob id to path mapping of a version, decoded once per version.
+
+        Args:
+            version (str): The version of the API.
+
+        Returns:
+            dict: The path of every blob in the version.
+
+        Raises:
+            KeyError: If the version is not indexed.
+        """
+        if version not in self.version_paths:
+            data = self.versions.get(version.encode())
+            if data is None:
+                raise KeyError(f"Version {version} is not indexed in {self.data_dir}")
+            self.version_paths[version] = parse_pathlist(data)
+        return self.version_paths[version]
+
+    def lookup(self, ident, version, family="C"):
+        """
+        Resolves an identifier against a version.
+
+        Args:
+            ident (str): The identifier to look up.
+            version (str): The version of the API.
+            family (str): The Elixir file family, i.e C.
+
+        Returns:
+            IdentRecord: The definitions, references and doc comments of the identifier.
+        """
+        paths = self.paths(version)
+        key = ident.encode()
+        definitions, references, documented = [], [], []
+
+        data = self.definitions.get(key)
+        for blob, kind, line, fam in parse_deflist(data) if data else []:
+            if blob in paths and fam == family:
+                definitions.append(Symbol(paths[blob], str(line), kind))
+        for database, symbols in (
+            (self.references, references),
+            (self.documented, documented),
+        ):
+            data = database.get(key)
+            for blob, lines, fam in parse_reflist(data) if data else []:
+                if blob in paths and fam == family:
+                    symbols.append(Symbol(paths[blob], lines, None))
+        return IdentRecord(ident, definitions, references, documented)
+
+    def close(self):
+        """
+        Closes the databases.
+        """
+        for database in (
+            self.definitions,
+            self.references,
+            self.documented,
+            self.versions,
+        ):
+            database.close()
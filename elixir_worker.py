@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+"""
+Long-lived Elixir query worker.
+
+Started once per (project, version) by query_api.ElixirWorker, it opens the
+Elixir index a single time and answers identifier lookups read from stdin,
+one identifier per line, with one JSON record per line on stdout.
+
+Usage:
+    elixir_worker.py <elixir directory> <version> [family]
+"""
+
+import os
+import sys
+import json
+
+
+def open_query(elixir_dir):
+    """
+    Imports the Elixir query module and opens the index of the current project.
+
+    Args:
+        elixir_dir (str): The directory of the Elixir installation.
+
+    Returns:
+        callable: The query function of the opened index.
+    """
+    sys.path.insert(0, elixir_dir)
+    import query
+
+    if hasattr(query, "Query"):
+        return query.Query(os.environ["LXR_DATA_DIR"], os.environ["LXR_REPO_DIR"]).query
+    return query.query
+
+
+def symbol_records(symbols):
+    """
+    Converts Elixir symbol instances into plain records.
+
+    Args:
+        symbols (list): The symbol instances returned by Elixir.
+
+    Returns:
+        list: A list of dictionaries with the path, line and type of each symbol.
+    """
+    return [
+        {
+            "path": symbol.path,
+            "line": str(symbol.line),
+            "type": getattr(symbol, "type", None),
+        }
+        for symbol in symbols
+    ]
+
+
+def serve(query, version, family):
+    """
+    Answers identifier lookups until stdin is closed.
+
+    Args:
+        query (callable): The query function of the opened index.
+        version (str): The version the identifiers are resolved against.
+        family (str): The Elixir file family, i.e C.
+    """
+    for line in sys.stdin:
+        ident = line.strip()
+        record = {"ident": ident}
+        try:
+            definitions, references, documented = query("ident", version, ident, family)
+            record["definitions"] = symbol_records(definitions)
+            record["references"] = symbol_records(references)
+            record["documented"] = symbol_records(documented)
+        except Exception as e:
+            record["error"] = str(e)
+        sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    serve(
+        open_query(sys.argv[1]),
+        sys.argv[2],
+        sys.argv[3] if len(sys.argv) > 3 else "C",
+    )
@@ -0,0 +1,135 @@
+import re
+import os
+import sqlite3
+
+IDENTIFIER_PATTERN = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*")
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "api-syscalls-analyser", "header_symbols.sqlite"
+)
+DEFAULT_BATCH_SIZE = 256
+
+
+def tokenize_header(header_path):
+    """
+    Collects the identifiers of a header file.
+
+    Args:
+        header_path (str): The path to the header.
+
+    Returns:
+        frozenset: Every identifier appearing in the header.
+    """
+    with open(header_path, "rb") as header_file:
+        data = header_file.read()
+    return frozenset(token.decode() for token in IDENTIFIER_PATTERN.findall(data))
+
+
+class HeaderSymbolCache:
+    def __init__(self, path=DEFAULT_INDEX_PATH, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Persistent cache of the identifiers of header files, keyed by path and
+        invalidated when the modification time or size of the header changes.
+
+        Newly tokenized headers are buffered and written by commit in a short
+        transaction, so the caches of concurrent repositories never wait on an
+        open write transaction of each other.
+
+        Args:
+            path (str): Location of the SQLite database, None keeps it in memory only.
+            batch_size (int): Number of buffered headers that triggers a commit.
+        """
+        self.memory = {}
+        self.tokenized = 0
+        self.batch_size = batch_size
+        self.pending = []
+        self.connection = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.connection = sqlite3.connect(path, timeout=60)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS headers ("
+                " path TEXT PRIMARY KEY, mtime REAL, size INTEGER, identifiers TEXT)"
+            )
+            self.connection.commit()
+
+    def identifiers(self, header_path):
+        """
+        Returns the identifiers of a header, tokenizing it only if it changed
+        since it was last seen.
+
+        Args:
+            header_path (str): The path to the header.
+
+        Returns:
+            frozenset: Every identifier appearing in the header.
+
+        Raises:
+            OSError: If the header cannot be read.
+        """
+        stat = os.stat(header_path)
+        stamp = (stat.st_mtime, stat.st_size)
+        cached = self.memory.get(header_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        identifiers = None
+        if self.connection is not None:
+            row = self.connection.execute(
+                "SELECT mtime, size, identifiers FROM headers WHERE path = ?",
+                (header_path,),
+            ).fetchone()
+            if row is not None and (row[0], row[1]) == stamp:
+                identifiers = frozenset(row[2].split())
+        if identifiers is None:
+            identifiers = tokenize_header(header_path)
+            self.tokenized += 1
+            if self.connection is not None:
+                self.pending.append(
+                    (header_path, stamp[0], stamp[1], " ".join(sorted(identifiers)))
+                )
+                if len(self.pending) >= self.batch_size:
+                    self.commit()
+        self.memory[header_path] = (stamp, identifiers)
+        return identifiers
+
+    def commit(self):
+        """
+        Writes the newly tokenized headers in one transaction.
+        """
+        if self.connection is not None and self.pending:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?)", self.pending
+                )
+            self.pending = []
+
+    def close(self):
+        """
+        Commits the newly tokenized headers and closes the cache.
+        """
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
+
+
+def syscalls_by_header(syscalls_set, header_paths, symbol_cache):
+    """
+    Maps syscalls to the headers mentioning them by intersecting the syscall
+    table with the identifier set of each header.
+
+    Args:
+        syscalls_set (set): The syscalls to look for.
+        header_paths (dict): header name -> path of the header file.
+        symbol_cache (HeaderSymbolCache): The cache of header identifiers.
+
+    Returns:
+        dict: A dictionary mapping each syscall to a set of header names.
+    """
+    mapping = {}
+    for header, header_path in header_paths.items():
+        for syscall in symbol_cache.identifiers(header_path).intersection(syscalls_set):
+            mapping.setdefault(syscall, set()).add(header)
+    symbol_cache.commit()
+    return mapping
@@ -0,0 +1,291 @@
+import os
+import re
+from source_cache import read_lines
+
+DIRECTIVE_INCLUDE_PATTERN = re.compile(
+    r"\s*#\s*include(?:_next)?\s*(?:<([^>]+)>|\"([^\"]+)\")"
+)
+COMMENT_TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*|//')
+INCLUDE_GRAPHS = {}
+
+
+def strip_comments(line: str(), in_comment: bool):
+    """
+    Removes the comments of a source line, keeping track of block comments that
+    span several lines.
+
+    Args:
+        line (str): The source line.
+        in_comment (bool): Whether the line starts inside a block comment.
+
+    Returns:
+        tuple: The line without comments and whether it ends inside a block comment.
+    """
+    code = []
+    position = 0
+    while True:
+        if in_comment:
+            end = line.find("*/", position)
+            if end < 0:
+                return "".join(code), True
+            position = end + 2
+            code.append(" ")
+            in_comment = False
+        match = COMMENT_TOKEN_PATTERN.search(line, position)
+        while match and match.group() not in ("/*", "//"):
+            match = COMMENT_TOKEN_PATTERN.search(line, match.end())
+        if not match:
+            code.append(line[position:])
+            return "".join(code), False
+        code.append(line[position : match.start()])
+        if match.group() == "//":
+            return "".join(code), False
+        position = match.end()
+        in_comment = True
+
+
+def scan_include_directives(lines):
+    """
+    Streams the include directives of a source file, only looking closely at
+    preprocessor directive lines. Handles line continuations, comments and both
+    the <...> and "..." forms.
+
+    Args:
+        lines (iterable): The lines of the source file.
+
+    Yields:
+        tuple: The included header and whether it was quoted, in the order they appear.
+    """
+    in_comment = False
+    pending = ""
+    for line in lines:
+        if not in_comment and not pending and "#" not in line and "/*" not in line:
+            continue
+        if in_comment or "/*" in line or "//" in line:
+            line, in_comment = strip_comments(line, in_comment)
+        line = line.rstrip("\r\n")
+        if line.endswith("\\"):
+            pending += line[:-1]
+            continue
+        directive, pending = pending + line, ""
+        match = DIRECTIVE_INCLUDE_PATTERN.match(directive)
+        if match:
+            if match.group(1):
+                yield match.group(1), False
+            else:
+                yield match.group(2), True
+
+
+class IncludeGraph:
+    def __init__(self, roots):
+        """
+        Resolves includes against an ordered list of -I style search roots and
+        memoizes the transitive closure of every header.
+
+        Args:
+            roots (list): The include directories, searched in order.
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.resolved = {}
+        self.missed = {}
+        self.lookups = {}
+        self.edges = {}
+        self.closures = {}
+        self.unresolved = set()
+
+    def resolve(self, header, quoted, current_dir):
+        """
+        Finds the file an include refers to. Quoted includes are looked up next
+        to the including file first, then in the roots.
+
+        Args:
+            header (str): The header as written in the directive.
+            quoted (bool): Whether the "..." form was used.
+            current_dir (str): The directory of the including file.
+
+        Returns:
+            str: The normalized path of the header, or None if it was not found.
+        """
+        key = (header, current_dir if quoted else None)
+        if key not in self.resolved:
+            path, missed = None, []
+            for root in ([current_dir] if quoted else []) + self.roots:
+                candidate = os.path.join(root, header)
+                if os.path.isfile(candidate):
+                    path = os.path.normpath(candidate)
+                    break
+                missed.append(os.path.normpath(candidate))
+            if path is None:
+                self.unresolved.add(header)
+            self.resolved[key] = path
+            self.missed[key] = missed
+        return self.resolved[key]
+
+    def direct_includes(self, file_path, source_cache=None, directives=None):
+        """
+        Resolves the includes of a file.
+
+        Args:
+            file_path (str): The path to the source or header file.
+            source_cache (SourceCache): The cache the file is read through, if any.
+            directives (list): The [header, quoted] includes of the file when it
+                was already scanned, the file is not read then.
+
+        Returns:
+            tuple: The resolved headers and the unresolved include names.
+        """
+        current_dir = os.path.dirname(file_path)
+        resolved, unresolved = [], []
+        if directives is None:
+            directives = scan_include_directives(read_lines(file_path, source_cache))
+        keys = self.lookups[file_path] = []
+        for header, quoted in directives:
+            keys.append((header, current_dir if quoted else None))
+            path = self.resolve(header, quoted, current_dir)
+            if path is None:
+                unresolved.append(header)
+            elif path not in resolved:
+                resolved.append(path)
+        return resolved, unresolved
+
+    def header_edges(self, header_path):
+        """
+        Returns the resolved includes of a header, parsed once per run.
+
+        Args:
+            header_path (str): The normalized path of the header.
+
+        Returns:
+            list: The resolved headers it includes.
+        """
+        if header_path not in self.edges:
+            try:
+                self.edges[header_path] = self.direct_includes(header_path)[0]
+            except OSError:
+                print(f"Header file not found: {header_path}")
+                self.edges[header_path] = []
+        return self.edges[header_path]
+
+    def closure(self, header_path):
+        """
+        Returns every header reachable from a header, memoized per header.
+        Include cycles are handled by collapsing strongly connected components
+        (iterative Tarjan), so all the headers of a cycle share one closure.
+
+        Args:
+            header_path (str): The normalized path of the header.
+
+        Returns:
+            frozenset: The headers reachable through its includes.
+        """
+        if header_path in self.closures:
+            return self.closures[header_path]
+        index, low, stack, on_stack = {header_path: 0}, {header_path: 0}, [], set()
+        stack.append(header_path)
+        on_stack.add(header_path)
+        work = [(header_path, iter(self.header_edges(header_path)))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child in self.closures:
+                    continue
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(self.header_edges(child))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    reached = set()
+                    for member in component:
+                        for child in self.header_edges(member):
+                            reached.add(child)
+                            reached.update(self.closures.get(child, ()))
+                    reached = frozenset(reached)
+                    for member in component:
+                        self.closures[member] = reached
+        return self.closures[header_path]
+
+    def reachable(self, file_path, source_cache=None, directives=None):
+        """
+        Answers which headers a source file reaches through its includes.
+
+        Args:
+            file_path (str): The path to the source file.
+            source_cache (SourceCache): The cache the file is read through, if any.
+            directives (list): The includes of the file when it was already scanned.
+
+        Returns:
+            tuple: The set of reachable header paths and the list of include
+                   names of the file that could not be resolved.
+        """
+        resolved, unresolved = self.direct_includes(file_path, source_cache, directives)
+        reached = set(resolved)
+        for header_path in resolved:
+            reached.update(self.closure(header_path))
+        return reached, unresolved
+
+    def probes(self, file_path, reached):
+        """
+        Lists the paths looked up and not found while resolving the includes of
+        a file and of the headers it reaches. Once one of them exists, an
+        unresolved include resolves or a header is shadowed by an earlier root.
+
+        Args:
+            file_path (str): The path to the source file, resolved by reachable.
+            reached (iterable): The headers the file reaches.
+
+        Returns:
+            set: The missed paths.
+        """
+        missed = set()
+        for node in [file_path, *reached]:
+            for key in self.lookups.get(node, ()):
+                missed.update(self.missed[key])
+        return missed
+
+    def display_name(self, header_path):
+        """
+        Names a header relative to the first root containing it, i.e sys/socket.h.
+
+        Args:
+            header_path (str): The normalized path of the header.
+
+        Returns:
+            str: The relative name, or the path itself for headers outside the roots.
+        """
+        for root in self.roots:
+            if header_path.startswith(root + os.sep):
+                return os.path.relpath(header_path, root)
+        return header_path
+
+
+def get_include_graph(roots):
+    """
+    Returns the include graph of a list of roots, shared by all the repositories
+    analysed in the same process.
+
+    Args:
+        roots (list): The include directories, searched in order.
+
+    Returns:
+        IncludeGraph: The graph for these roots.
+    """
+    key = tuple(os.path.abspath(root) for root in roots)
+    if key not in INCLUDE_GRAPHS:
+        INCLUDE_GRAPHS[key] = IncludeGraph(key)
+    return INCLUDE_GRAPHS[key]
@@ -0,0 +1,216 @@
+import os
+import json
+import hashlib
+
+MANIFEST_FORMAT = 4
+DEFAULT_MANIFEST_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "api-syscalls-analyser", "manifests"
+)
+
+
+def content_hash(data):
+    """
+    Args:
+        data (bytes): The content of a file, bytes or any buffer such as an mmap.
+
+    Returns:
+        str: The SHA-1 hex digest of the content.
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_stamp(path):
+    """
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        list: The modification time in nanoseconds and the size of the file.
+    """
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def manifest_path(manifest_dir, repo_path):
+    """
+    Names the manifest of a repository after its absolute path, so several
+    output directories share it.
+
+    Args:
+        manifest_dir (str): The directory holding the manifests.
+        repo_path (str): The path to the repository.
+
+    Returns:
+        str: The path of the manifest file.
+    """
+    key = hashlib.sha1(os.path.abspath(repo_path).encode()).hexdigest()[:16]
+    return os.path.join(manifest_dir, f"{os.path.basename(repo_path)}-{key}.json")
+
+
+def make_entry(stamp, data, results, depends=(), repo_root=None, probes=()):
+    """
+    Builds the manifest entry of a processed file. Only the headers inside the
+    repository are recorded as dependencies, headers outside it are covered by
+    the context of the manifest. The include lookups that missed are recorded
+    wherever they are, a header appearing there changes the includes.
+
+    Args:
+        stamp (list): The file_stamp of the file, taken before it was read.
+        data (bytes): The content of the file the results were computed from.
+        results (dict): JSON-serializable results of the file.
+        depends (iterable): The headers reached by the file.
+        repo_root (str): The absolute path of the repository.
+        probes (iterable): The paths the include lookups of the file missed,
+            see IncludeGraph.probes.
+
+    Returns:
+        dict: The stamp, hash, dependencies, probes and results of the file.
+    """
+    prefix = os.path.join(os.path.abspath(repo_root), "") if repo_root else None
+    return {
+        "stamp": stamp,
+        "hash": content_hash(data),
+        "depends": {
+            header_path: file_stamp(header_path)
+            for header_path in depends
+            if prefix and header_path.startswith(prefix)
+        },
+        "probes": sorted(probes),
+        "results": results,
+    }
+
+
+class RepoManifest:
+    def __init__(self, path, context, source_cache=None):
+        """
+        Per-repository manifest of the content hash of every source file and the
+        results computed from it, i.e its identifiers, includes, syscalls and
+        line hits. Results of unchanged files are reused by the next run.
+
+        A file is reprocessed when its content changed, when one of the
+        repository headers it includes changed, or when a header appeared where
+        one of its include lookups missed, i.e an unresolved include or a header
+        shadowing one of a later include root. The whole manifest is dropped when
+        the context of the analysis (include roots, sysroot index, syscall table)
+        differs from the previous run.
+
+        Args:
+            path (str): Location of the manifest file.
+            context (dict): JSON-serializable settings the results depend on.
+            source_cache (SourceCache): The cache the sources are read through, if any.
+        """
+        self.path = path
+        self.context = context
+        self.source_cache = source_cache
+        self.previous = {}
+        self.files = {}
+        self.exists = {}
+        self.reused = 0
+        self.reprocessed = 0
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+            if data.get("format") == MANIFEST_FORMAT and data.get("context") == context:
+                self.previous = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _read(self, file_path):
+        """
+        Args:
+            file_path (str): The path to the source file.
+
+        Returns:
+            bytes: The content of the file.
+        """
+        if self.source_cache is not None:
+            return self.source_cache.read_bytes(file_path)
+        with open(file_path, "rb") as file:
+            return file.read()
+
+    def _is_unchanged(self, file_path, entry):
+        """
+        Checks a previous entry against the file and the headers it depends on,
+        hashing the file only when its stamp moved.
+
+        Args:
+            file_path (str): The path to the source file.
+            entry (dict): The entry of the previous run.
+
+        Returns:
+            bool: Whether the previous results still hold.
+        """
+        stamp = file_stamp(file_path)
+        if stamp != entry["stamp"]:
+            if content_hash(self._read(file_path)) != entry["hash"]:
+                return False
+            entry["stamp"] = stamp
+        for header_path, header_stamp in entry["depends"].items():
+            try:
+                if file_stamp(header_path) != header_stamp:
+                    return False
+            except OSError:
+                return False
+        for probe in entry["probes"]:
+            if probe not in self.exists:
+                self.exists[probe] = os.path.exists(probe)
+            if self.exists[probe]:
+                return False
+        return True
+
+    def lookup(self, file_path, sections):
+        """
+        Returns the stored results of a file when it is unchanged since the
+        previous run and every requested result was stored.
+
+        Args:
+            file_path (str): The path to the source file.
+            sections (iterable): The results needed, i.e "includes" or "syscalls".
+
+        Returns:
+            dict: The results of the file, or None if it has to be processed again.
+        """
+        previous = self.previous.get(file_path)
+        try:
+            if previous is None or not self._is_unchanged(file_path, previous):
+                return None
+        except OSError:
+            return None
+        if not all(section in previous["results"] for section in sections):
+            return None
+        self.files[file_path] = previous
+        self.reused += 1
+        return previous["results"]
+
+    def store(self, file_path, entry):
+        """
+        Records the entry of a file processed in this run.
+
+        Args:
+            file_path (str): The path to the source file.
+            entry (dict): The entry built by make_entry.
+        """
+        self.files[file_path] = entry
+        self.reprocessed += 1
+
+    def save(self):
+        """
+        Writes the manifest, dropping the files that were not seen in this run.
+        """
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(
+                {"format": MANIFEST_FORMAT, "context": self.context, "files": self.files},
+                file,
+                separators=(",", ":"),
+            )
+        os.replace(temporary, self.path)
+
+    def stats(self):
+        """
+        Returns:
+            str: A summary of the reused and reprocessed files.
+        """
+        return f"{self.reused} files reused, {self.reprocessed} reprocessed"
@@ -1,19 +1,39 @@
-import re
 import os
+import sys
+import json
 import click
+import queue
+import atexit
+import collections
+import functools
+import threading
 import subprocess
 import api_parsing
-from pygments.token import Name
-from pygments.lexers import CLexer, CppLexer
+import elixir_data
+import query_cache
+from source_scan import scan_file
+from concurrent.futures import ThreadPoolExecutor
 
 API_CALLS = []
-
-def get_c_cpp_files(root_dir):
+ELIXIR_DIR = "/home/bsp_projects/elixir"
+ELIXIR_QUERY = os.path.join(ELIXIR_DIR, "query.py")
+ELIXIR_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "elixir_worker.py")
+DEFAULT_QUERY_JOBS = 4
+WORKER_BATCH_SIZE = 256
+IDENTIFIER_MODES = ("all", "calls", "declarations")
+API_DIFF_FILE = "api_calls_diff.json"
+ELIXIR_WORKERS = {}
+ELIXIR_DATA = {}
+ELIXIR_DATA_LOCK = threading.Lock()
+
+def get_c_cpp_files(root_dir, sources=None):
     """
     Retrieve a list of C and C++ files from the specified root directory.
 
     Args:
         root_dir (str): The root directory to search for C and C++ files.
+        sources (list): The source files already discovered in root_dir, the
+            directory is only walked when None.
 
     Returns:
         list: A list of file paths for C and C++ files found in the root directory.
@@ -21,32 +41,76 @@ def get_c_cpp_files(root_dir):
     c_files = []
     cpp_files = []
 
-    for dirpath, _, filenames in os.walk(root_dir):
-        for filename in filenames:
-            if filename.endswith(".c"):
-                c_files.append(os.path.join(dirpath, filename))
-            elif filename.endswith(".cpp"):
-                cpp_files.append(os.path.join(dirpath, filename))
-    
+    if sources is None:
+        sources = (
+            os.path.join(dirpath, filename)
+            for dirpath, _, filenames in os.walk(root_dir)
+            for filename in filenames
+        )
+    for path in sources:
+        if path.endswith(".c"):
+            c_files.append(path)
+        elif path.endswith(".cpp"):
+            cpp_files.append(path)
+
     return c_files if c_files else cpp_files
 
 
-def extract_functions_from_code(code, language):
+def extract_file_identifiers(file, source_cache=None, scan=None):
+    """
+    Extracts the macros and the classified identifiers of a single C/C++ file.
+
+    Args:
+        file (str): The path to the file.
+        source_cache (SourceCache): The cache the file is read through, if any.
+        scan (SourceScan): The scan of the file, it is scanned here if None.
+
+    Returns:
+        dict: The "macros" defined in the file, every identifier ("names"), the
+              names in call position ("calls"), the declared functions
+              ("declarations") and the functions defined with a body ("defined").
+    """
+    if scan is None:
+        scan = scan_file(file, source_cache)
+    calls, declarations, defined = scan.structure()
+    return {
+        "macros": scan.macros,
+        "names": sorted(scan.names()),
+        "calls": sorted(calls),
+        "declarations": sorted(declarations),
+        "defined": sorted(defined),
+    }
+
+
+def select_identifiers(file_identifiers, mode="all"):
     """
-    Extracts functions from the given code based on the specified language.
+    Chooses the identifiers of a repository to send to Elixir.
 
     Args:
-        code (str): The code from which to extract functions.
-        language (str): The programming language of the code ("C++" or "C").
+        file_identifiers (iterable): The results of extract_file_identifiers.
+        mode (str): One of IDENTIFIER_MODES. "all" keeps every name, "calls"
+            only the names in call position and "declarations" the calls and
+            the declared functions. Both drop the functions the repository
+            defines itself.
 
     Returns:
-        list: A list of unique function names extracted from the code.
+        tuple: The sorted identifiers to query and the number of identifiers
+               "all" would have queried.
     """
-    lexer = CppLexer() if language == "C++" else CLexer()
-    tokens = lexer.get_tokens(code)
-    functions = [tok[1] for tok in tokens if tok[0] in Name]
-    functions_1 = [tok[1] for tok in tokens if tok[0] == Name.Function]
-    return list(set(functions).union(set(functions_1)))
+    macros, names, selected, defined = set(), set(), set(), set()
+    for identifiers in file_identifiers:
+        macros.update(identifiers["macros"])
+        names.update(identifiers["names"])
+        defined.update(identifiers["defined"])
+        if mode == "all":
+            selected.update(identifiers["names"])
+        else:
+            selected.update(identifiers["calls"])
+            if mode == "declarations":
+                selected.update(identifiers["declarations"])
+    if mode != "all":
+        selected -= defined
+    return sorted(selected - macros), len(names - macros)
 
 
 def remove_items(test_list, items):
@@ -63,116 +127,570 @@ def remove_items(test_list, items):
     res = list(filter((items).__ne__, test_list))
     return res
 
-def get_false_pos() -> list():
+
+def query_identifier(item, version):
     """
-    Retrieves false positive matches from the output file.
+    Queries the Elixir index for a single identifier.
+
+    Args:
+        item (str): The identifier to look up.
+        version (str): The version of the API.
 
     Returns:
-        A list of false positive matches.
-    """
-    command = r"grep -Pzo '\^\^ \w+\nSymbol Definitions:\n\nSymbol References:\n\nDocumented in:\n' /home/nos1abt/py-test/output.txt"
-    process = subprocess.Popen(command, stdout=subprocess.PIPE, shell=True)
-    output, error = process.communicate()
-    f_pos = output.decode()
-    if error:
-        print(f"Error: {error}")
-    else:
-        pattern = r"\^\^ (\w+)"
-        matches = re.findall(pattern, f_pos)
-        # pprint.pprint(matches) # for debugging purposes
-        return matches
+        tuple: The output of the query and whether the query succeeded.
+    """
+    result = subprocess.run(
+        [ELIXIR_QUERY, version, "ident", item, "C"], stdout=subprocess.PIPE, text=True
+    )
+    return result.stdout, result.returncode == 0
+
 
+def shell_results(items, version, jobs):
+    """
+    Queries identifiers by running query.py once per identifier.
 
+    Args:
+        items (list): The identifiers to look up.
+        version (str): The version of the API.
+        jobs (int): Maximum number of concurrent queries.
+
+    Yields:
+        tuple: The output of each query and whether it succeeded, in input order.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        yield from executor.map(
+            functools.partial(query_identifier, version=version), items
+        )
+
+
+def render_ident_record(record):
+    """
+    Renders a structured identifier record in the text format of query.py, for
+    the query cache and the raw API output. Records are classified from their
+    fields, see api_parsing.symbol_types.
 
+    Args:
+        record (elixir_data.IdentRecord): The definitions, references and doc
+            comments of an identifier.
 
-# def API_Calls_fetch(repo_path, version):
-#     """
-#     Fetches API calls and macros from C/C++ files in the given repository path.
+    Returns:
+        str: The rendered output.
+    """
+    lines = ["Symbol Definitions:"]
+    lines.extend(
+        f"Symbol in path: {d.path}, line: {d.line} , type: {d.type}"
+        for d in record.definitions
+    )
+    lines.append("\nSymbol References:")
+    lines.extend(f"Symbol in path: {r.path}, line: {r.line}" for r in record.references)
+    lines.append("\nDocumented in:")
+    lines.extend(f"Symbol in path: {d.path}, line: {d.line}" for d in record.documented)
+    return "\n".join(lines) + "\n"
+
+
+def ident_output(output):
+    """
+    Args:
+        output (str or elixir_data.IdentRecord): The result of a query backend.
 
-#     Args:
-#         repo_path (str): The path to the repository.
-#         version (str): The version of the API.".
+    Returns:
+        str: The result in the text format of query.py, records are rendered.
+    """
+    if isinstance(output, elixir_data.IdentRecord):
+        return render_ident_record(output)
+    return output
 
-#     Returns:
-#         None
-#     """
-#     MACROS = []
-#     functions = []
-#     language = ""
-#     macro_pattern = re.compile(r"#define\s+(\w+)")
 
-#     for file in get_c_cpp_files(repo_path):
-#         fdata = open(file, "r").read()
-#         language = "C" if file.endswith(".c") else "C++"
-#         matches = macro_pattern.findall(fdata)
-#         MACROS.extend(matches)
-#         functions.extend(extract_functions_from_code(fdata, language))
+def decode_ident_record(data):
+    """
+    Converts a JSON record written by elixir_worker.py into an IdentRecord.
 
-#     MACROS = set(MACROS)
-#     functions = set(functions)
-#     with open("output.txt", "w") as file:
-#         for item in functions:
-#             if item not in MACROS:
-#                 command = f"echo ^^ {item} ; /home/bsp_projects/elixir/query.py {version} ident {item} C ;  echo \n"
-#                 subprocess.run(command, shell=True, stdout=file)
+    Args:
+        data (dict): The decoded JSON record.
 
-def API_Calls_fetch(repo_path, version):
+    Returns:
+        elixir_data.IdentRecord: The record, or None if the query failed.
     """
-    Fetches API calls and macros from C/C++ files in the given repository path.
+    if "error" in data:
+        return None
+    return elixir_data.IdentRecord(
+        data["ident"],
+        *(
+            [elixir_data.Symbol(s["path"], s["line"], s["type"]) for s in data[key]]
+            for key in ("definitions", "references", "documented")
+        ),
+    )
+
+
+class ElixirWorker:
+    def __init__(self, version, elixir_dir=ELIXIR_DIR):
+        """
+        Starts a worker process that keeps the Elixir index of the current
+        project open and resolves identifiers against the given version.
+
+        Args:
+            version (str): The version of the API.
+            elixir_dir (str): The directory of the Elixir installation.
+        """
+        self.version = version
+        self.process = subprocess.Popen(
+            [sys.executable, ELIXIR_WORKER, elixir_dir, version, "C"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+    def query(self, items):
+        """
+        Resolves a batch of identifiers.
+
+        Args:
+            items (list): The identifiers to look up, at most WORKER_BATCH_SIZE.
+
+        Returns:
+            list: One elixir_data.IdentRecord per identifier (None if it failed),
+                  in input order.
+
+        Raises:
+            RuntimeError: If the worker process exited.
+        """
+        self.process.stdin.write("".join(f"{item}\n" for item in items))
+        self.process.stdin.flush()
+        records = []
+        for _ in items:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(
+                    f"Elixir worker for {self.version} exited with {self.process.poll()}"
+                )
+            records.append(decode_ident_record(json.loads(line)))
+        return records
+
+    def close(self):
+        """
+        Stops the worker process.
+        """
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def get_workers(version, jobs):
+    """
+    Returns the pool of workers for the current project and version, starting
+    them on first use so the index is only opened once per run.
 
     Args:
-        repo_path (str): The path to the repository.
         version (str): The version of the API.
+        jobs (int): Number of workers in the pool.
 
     Returns:
-        None
+        queue.Queue: The idle workers.
+    """
+    key = (os.environ.get("PROJ"), version)
+    idle, started, lock = ELIXIR_WORKERS.setdefault(
+        key, (queue.Queue(), [], threading.Lock())
+    )
+    with lock:
+        while len(started) < max(1, jobs):
+            worker = ElixirWorker(version)
+            started.append(worker)
+            idle.put(worker)
+    return idle
+
+
+@atexit.register
+def close_workers():
+    """
+    Stops all the Elixir workers and closes the databases opened in this process.
+    """
+    for _, started, _ in ELIXIR_WORKERS.values():
+        for worker in started:
+            worker.close()
+    ELIXIR_WORKERS.clear()
+    for index in ELIXIR_DATA.values():
+        index.close()
+    ELIXIR_DATA.clear()
+
+
+def worker_results(items, version, jobs):
+    """
+    Queries identifiers through long-lived Elixir workers in batches.
+
+    Args:
+        items (list): The identifiers to look up.
+        version (str): The version of the API.
+        jobs (int): Number of workers queried concurrently.
+
+    Yields:
+        tuple: The elixir_data.IdentRecord of each query and whether it
+               succeeded, in input order.
     """
-    MACROS = []
-    functions = []
-    language = ""
-    macro_pattern = re.compile(r"#define\s+(\w+)")
+    idle = get_workers(version, jobs)
+
+    def run_batch(batch):
+        worker = idle.get()
+        try:
+            return worker.query(batch)
+        finally:
+            idle.put(worker)
+
+    batches = [
+        items[i : i + WORKER_BATCH_SIZE] for i in range(0, len(items), WORKER_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for records in executor.map(run_batch, batches):
+            for record in records:
+                if record is None:
+                    yield "", False
+                else:
+                    yield record, True
+
+
+def data_results(items, version, jobs):
+    """
+    Queries identifiers by reading the Elixir databases under $LXR_DATA_DIR
+    directly, without spawning any process.
+
+    Args:
+        items (list): The identifiers to look up.
+        version (str): The version of the API.
+        jobs (int): Unused, lookups are served in-process.
+
+    Yields:
+        tuple: The elixir_data.IdentRecord of each query and whether it
+               succeeded, in input order.
+    """
+    data_dir = os.environ["LXR_DATA_DIR"]
+    # The databases are shared by the repositories analysed in threads
+    with ELIXIR_DATA_LOCK:
+        if data_dir not in ELIXIR_DATA:
+            ELIXIR_DATA[data_dir] = elixir_data.ElixirData(data_dir)
+    index = ELIXIR_DATA[data_dir]
+    for item in items:
+        with ELIXIR_DATA_LOCK:
+            record = index.lookup(item, version)
+        yield record, True
+
+
+QUERY_BACKENDS = {"shell": shell_results, "worker": worker_results, "data": data_results}
+
+
+def collect_identifiers(
+    repo_path,
+    sources=None,
+    source_cache=None,
+    file_identifiers=None,
+    identifier_mode="all",
+):
+    """
+    Extracts the identifiers of the C/C++ files of the repository once, so they
+    can be resolved against any number of versions.
+
+    Args:
+        repo_path (str): The path to the repository.
+        sources (list): The source files already discovered in repo_path.
+        source_cache (SourceCache): The cache the sources are read through, if any.
+        file_identifiers (dict): file -> identifiers already extracted by
+            analyse_file, the other files are lexed here.
+        identifier_mode (str): Which identifiers are queried, see select_identifiers.
 
-    with click.progressbar(get_c_cpp_files(repo_path), label="Processing files") as bar:
+    Returns:
+        list: The sorted identifiers to query.
+    """
+    extracted = []
+    files = get_c_cpp_files(repo_path, sources)
+    with click.progressbar(files, label="Processing files") as bar:
         for file in bar:
-            fdata = open(file, "r").read()
-            language = "C" if file.endswith(".c") else "C++"
-            matches = macro_pattern.findall(fdata)
-            MACROS.extend(matches)
-            functions.extend(extract_functions_from_code(fdata, language))
-
-    MACROS = set(MACROS)
-    functions = set(functions)
-    with open("output.txt", "w") as file:
-        with click.progressbar(functions, label="Runnning Queries! - be patient!") as bar:
-            for item in bar:
-                if item not in MACROS:
-                    command = f"echo ^^ {item} ; /home/bsp_projects/elixir/query.py {version} ident {item} C ;  echo \n"
-                    subprocess.run(command, shell=True, stdout=file)
+            if file_identifiers and file in file_identifiers:
+                extracted.append(file_identifiers[file])
+            else:
+                extracted.append(extract_file_identifiers(file, source_cache))
+
+    functions, seen = select_identifiers(extracted, identifier_mode)
+    print(
+        f"* {len(functions)} identifiers to query ({identifier_mode}),"
+        f" {seen - len(functions)} of {seen} queries avoided"
+    )
+    return functions
+
+
+def query_identifiers(
+    functions, version, cache_path=None, jobs=DEFAULT_QUERY_JOBS, backend="shell"
+):
+    """
+    Resolves identifiers against a version.
+
+    The identifiers are queried by a bounded pool of workers, the results are
+    yielded in sorted identifier order so the output does not depend on timing.
+    Only the identifiers the cache does not answer for this version are queried.
 
+    Args:
+        functions (list): The sorted identifiers, see collect_identifiers.
+        version (str): The version of the API.
+        cache_path (str): Location of the persistent query cache, disabled if None.
+        jobs (int): Maximum number of concurrent Elixir queries.
+        backend (str): The query backend, one of QUERY_BACKENDS.
 
-def main(path_api_output, repo_output_folder, repo_path, version):
+    Yields:
+        tuple: Each identifier and the output of its query, the text of query.py
+               or the record of the worker and data backends.
+    """
+    cache = query_cache.QueryCache(cache_path) if cache_path else None
+    cached, skipped = {}, 0
+    if cache:
+        # Identifiers found unresolved by earlier runs are not queried again
+        unresolved = cache.negatives(version)
+        for item in functions:
+            if item in unresolved:
+                cached[item] = api_parsing.EMPTY_IDENT_OUTPUT
+                skipped += 1
+                continue
+            output = cache.get(item, version)
+            if output is not None:
+                cached[item] = output
+    pending = [item for item in functions if item not in cached]
+    print(f"* {len(pending)} of {len(functions)} identifiers queried against {version}")
+
+    results = QUERY_BACKENDS[backend](pending, version, jobs)
+    try:
+        with click.progressbar(
+            functions, label="Runnning Queries! - be patient!"
+        ) as bar:
+            for item in bar:
+                if item in cached:
+                    output = cached.pop(item)
+                else:
+                    output, ok = next(results)
+                    if cache and ok:
+                        if api_parsing.is_false_positive(output):
+                            cache.put_negative(item, version)
+                        else:
+                            cache.put(item, version, ident_output(output))
+                yield item, output
+    finally:
+        results.close()
+        if cache:
+            cache.close()
+            print(f"* Elixir query cache: {cache.stats()}")
+            print(f"* {skipped} unresolved identifiers skipped")
+
+
+def API_Calls_fetch(
+    repo_path,
+    version,
+    cache_path=None,
+    jobs=DEFAULT_QUERY_JOBS,
+    backend="shell",
+    sources=None,
+    source_cache=None,
+    file_identifiers=None,
+    identifier_mode="all",
+):
+    """
+    Fetches API calls and macros from C/C++ files in the given repository path.
+
+    Args:
+        repo_path (str): The path to the repository.
+        version (str): The version of the API.
+        cache_path (str): Location of the persistent query cache, disabled if None.
+        jobs (int): Maximum number of concurrent Elixir queries.
+        backend (str): The query backend, one of QUERY_BACKENDS.
+        sources (list): The source files already discovered in repo_path.
+        source_cache (SourceCache): The cache the sources are read through, if any.
+        file_identifiers (dict): file -> identifiers already extracted by
+            analyse_file, the other files are lexed here.
+        identifier_mode (str): Which identifiers are queried, see select_identifiers.
+
+    Yields:
+        tuple: Each identifier and the output of its query.
+    """
+    functions = collect_identifiers(
+        repo_path, sources, source_cache, file_identifiers, identifier_mode
+    )
+    yield from query_identifiers(functions, version, cache_path, jobs, backend)
+
+
+def main(
+    path_api_output,
+    repo_output_folder,
+    repo_path,
+    version,
+    cache_path=None,
+    jobs=DEFAULT_QUERY_JOBS,
+    backend="shell",
+    sources=None,
+    source_cache=None,
+    file_identifiers=None,
+    keep_api_output=False,
+    identifier_mode="all",
+    functions=None,
+):
     """
     Main function to run API_Calls_hunter and process the output.
 
+    The query results are parsed as they arrive and the API calls whose
+    definitions include a function are written to filtered_api_calls.json in
+    the repository output folder.
+
     Args:
         path_api_output (str): Path to the API output file.
         repo_output_folder (str): Path to the output folder for the repository.
         repo_path (str): Path to the repository.
+        version (str): The version of the API.
+        cache_path (str): Location of the persistent query cache, disabled if None.
+        jobs (int): Maximum number of concurrent Elixir queries.
+        backend (str): The query backend, one of QUERY_BACKENDS.
+        sources (list): The source files already discovered in repo_path.
+        source_cache (SourceCache): The cache the sources are read through, if any.
+        file_identifiers (dict): file -> identifiers already extracted by
+            analyse_file, the other files are lexed here.
+        identifier_mode (str): Which identifiers are queried, see select_identifiers.
+        keep_api_output (bool): Also write the filtered raw query output to
+            path_api_output in the repository output folder.
+        functions (list): The identifiers already collected, see
+            collect_identifiers, the repository is only lexed when None.
 
     Returns:
-        None
+        dict: The API calls and the types of their definitions.
     """
     print(path_api_output, repo_output_folder)
 
     # with click.progressbar(length=1, label="Running API_Calls_hunter") as bar:
     #     API_Calls_fetch(repo_path, version)
     #     bar.update(1)
-    API_Calls_fetch(repo_path, version)
-    get_false_pos()
-    api_parsing.replace_lines_in_file("output.txt", path_api_output, repo_output_folder)
-    l = api_parsing.extract_words_and_types(path_api_output, repo_output_folder)
-    api_parsing.filer_final_api_calls(repo_output_folder, "function", l)
-    l.clear()
-    os.system("rm output.txt")
+    api_calls, false_positives = {}, set()
+
+    if functions is None:
+        queries = API_Calls_fetch(
+            repo_path,
+            version,
+            cache_path,
+            jobs,
+            backend,
+            sources,
+            source_cache,
+            file_identifiers,
+            identifier_mode,
+        )
+    else:
+        queries = query_identifiers(functions, version, cache_path, jobs, backend)
+
+    def query_lines():
+        for item, output in queries:
+            if api_parsing.is_false_positive(output):
+                false_positives.add(item)
+            types = api_parsing.symbol_types(output)
+            if "function" in types:
+                api_calls[item] = sorted(types)
+            if keep_api_output:
+                # Only the raw output needs the text of query.py
+                yield from f"^^ {item}\n{ident_output(output)}\n".splitlines(keepends=True)
+
+    if keep_api_output:
+        lines = api_parsing.remove_pattern_from_list(query_lines(), false_positives)
+        raw_path = os.path.join(repo_output_folder, os.path.basename(path_api_output))
+        with open(raw_path, "w") as file:
+            file.writelines(lines)
+    else:
+        collections.deque(query_lines(), maxlen=0)
+    with open(os.path.join(repo_output_folder, "filtered_api_calls.json"), "w") as file:
+        json.dump(api_calls, file, indent=2)
+    print(f"* {len(api_calls)} API calls written to {repo_output_folder}")
+    return api_calls
+
+
+def diff_api_calls(versions, api_calls):
+    """
+    Compares the API calls found in consecutive versions.
 
+    Args:
+        versions (list): The versions, in the order they are compared.
+        api_calls (dict): version -> API calls, as returned by main.
 
+    Returns:
+        list: One {"from", "to", "added", "removed"} entry per pair of versions.
+    """
+    return [
+        {
+            "from": old,
+            "to": new,
+            "added": sorted(api_calls[new].keys() - api_calls[old].keys()),
+            "removed": sorted(api_calls[old].keys() - api_calls[new].keys()),
+        }
+        for old, new in zip(versions, versions[1:])
+    ]
+
+
+def analyse_versions(
+    path_api_output,
+    repo_output_folder,
+    repo_path,
+    versions,
+    cache_path=None,
+    jobs=DEFAULT_QUERY_JOBS,
+    backend="shell",
+    sources=None,
+    source_cache=None,
+    file_identifiers=None,
+    keep_api_output=False,
+    identifier_mode="all",
+):
+    """
+    Resolves the API calls of the repository against several versions.
+
+    The identifiers are extracted once and each version only queries the
+    identifiers its cache does not answer. With a single version the output
+    is the one of main, otherwise every version writes its filtered_api_calls.json
+    in a folder named after it and the API calls appearing or disappearing
+    between consecutive versions are written to API_DIFF_FILE.
+
+    Args:
+        path_api_output (str): Path to the API output file.
+        repo_output_folder (str): Path to the output folder for the repository.
+        repo_path (str): Path to the repository.
+        versions (list): The versions of the API, in the order they are compared.
+        cache_path (str): Location of the persistent query cache, disabled if None.
+        jobs (int): Maximum number of concurrent Elixir queries.
+        backend (str): The query backend, one of QUERY_BACKENDS.
+        sources (list): The source files already discovered in repo_path.
+        source_cache (SourceCache): The cache the sources are read through, if any.
+        file_identifiers (dict): file -> identifiers already extracted by
+            analyse_file, the other files are lexed here.
+        keep_api_output (bool): Also write the filtered raw query output of
+            every version.
+        identifier_mode (str): Which identifiers are queried, see select_identifiers.
+
+    Returns:
+        dict: version -> the API calls and the types of their definitions.
+    """
+    functions = collect_identifiers(
+        repo_path, sources, source_cache, file_identifiers, identifier_mode
+    )
+    api_calls = {}
+    for version in versions:
+        version_folder = repo_output_folder
+        if len(versions) > 1:
+            version_folder = os.path.join(repo_output_folder, version.replace("/", "_"))
+            os.makedirs(version_folder, exist_ok=True)
+        api_calls[version] = main(
+            path_api_output,
+            version_folder,
+            repo_path,
+            version,
+            cache_path,
+            jobs,
+            backend,
+            keep_api_output=keep_api_output,
+            functions=functions,
+        )
+
+    if len(versions) > 1:
+        diff = diff_api_calls(versions, api_calls)
+        with open(os.path.join(repo_output_folder, API_DIFF_FILE), "w") as file:
+            json.dump(diff, file, indent=2)
+        for entry in diff:
+            print(
+                f"* {entry['from']} -> {entry['to']}: {len(entry['added'])} API calls"
+                f" added, {len(entry['removed'])} removed"
+            )
+    return api_calls
@@ -0,0 +1,256 @@
+import os
+import time
+import sqlite3
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "api-syscalls-analyser", "elixir_queries.sqlite"
+)
+DEFAULT_MAX_ENTRIES = 500000
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60  # seconds
+DEFAULT_BATCH_SIZE = 256
+
+
+def index_stamp(data_dir):
+    """
+    Computes a stamp for an Elixir index so cached answers can be invalidated
+    once the project is re-indexed.
+
+    Args:
+        data_dir (str): The LXR_DATA_DIR of the project.
+
+    Returns:
+        str: The newest modification time of the index files, or an empty string
+             if the directory is unknown.
+    """
+    if not data_dir or not os.path.isdir(data_dir):
+        return ""
+    stamp = os.path.getmtime(data_dir)
+    for entry in os.scandir(data_dir):
+        if entry.is_file():
+            stamp = max(stamp, entry.stat().st_mtime)
+    return str(int(stamp))
+
+
+class QueryCache:
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        project=None,
+        data_dir=None,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_age=DEFAULT_MAX_AGE,
+        batch_size=DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Opens (or creates) a persistent cache of Elixir identifier queries.
+
+        Entries are keyed by (project, version, identifier). The whole project is
+        invalidated when its index stamp changes, entries older than max_age are
+        dropped and the least recently used entries are evicted above max_entries.
+
+        Identifiers the index neither defines nor references are kept apart in
+        a negative cache, so they are skipped before any query is issued.
+
+        New entries are buffered and written in short transactions of
+        batch_size entries, so the caches of concurrent repositories sharing
+        the database never wait on each other for a whole query phase.
+
+        Args:
+            path (str): Location of the SQLite database.
+            project (str): The Elixir project, defaults to $PROJ.
+            data_dir (str): The Elixir data directory, defaults to $LXR_DATA_DIR.
+            max_entries (int): Maximum number of cached identifiers.
+            max_age (int): Maximum age of an entry in seconds.
+            batch_size (int): Number of new entries written per transaction.
+        """
+        self.project = project or os.environ.get("PROJ", "default")
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.batch_size = batch_size
+        self._used = set()
+        self._queries = []
+        self._negatives = []
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            " project TEXT, version TEXT, identifier TEXT, output TEXT,"
+            " created REAL, last_used REAL,"
+            " PRIMARY KEY (project, version, identifier))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS negatives ("
+            " project TEXT, version TEXT, identifier TEXT, created REAL,"
+            " PRIMARY KEY (project, version, identifier))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS projects (project TEXT PRIMARY KEY, stamp TEXT)"
+        )
+        self.connection.commit()
+        self._check_stamp(index_stamp(data_dir or os.environ.get("LXR_DATA_DIR")))
+
+    def _check_stamp(self, stamp):
+        """
+        Invalidates the project when its Elixir index changed since the last run.
+
+        Args:
+            stamp (str): The current index stamp of the project.
+        """
+        row = self.connection.execute(
+            "SELECT stamp FROM projects WHERE project = ?", (self.project,)
+        ).fetchone()
+        if row is not None and row[0] != stamp:
+            self.invalidate()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO projects VALUES (?, ?)", (self.project, stamp)
+        )
+        self.connection.commit()
+
+    def get(self, identifier, version):
+        """
+        Looks up the cached query output of an identifier.
+
+        Args:
+            identifier (str): The identifier that was queried.
+            version (str): The version it was queried against.
+
+        Returns:
+            str: The cached output, or None on a miss.
+        """
+        row = self.connection.execute(
+            "SELECT output, created FROM queries"
+            " WHERE project = ? AND version = ? AND identifier = ?",
+            (self.project, version, identifier),
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add((version, identifier))
+        return row[0]
+
+    def put(self, identifier, version, output):
+        """
+        Stores the query output of an identifier.
+
+        Args:
+            identifier (str): The identifier that was queried.
+            version (str): The version it was queried against.
+            output (str): The output of the query.
+        """
+        now = time.time()
+        self._queries.append((self.project, version, identifier, output, now, now))
+        if len(self._queries) + len(self._negatives) >= self.batch_size:
+            self.flush()
+
+    def negatives(self, version):
+        """
+        Loads the identifiers known to be unresolved in a version, in one query.
+
+        Args:
+            version (str): The version they were queried against.
+
+        Returns:
+            set: The unresolved identifiers that did not expire.
+        """
+        rows = self.connection.execute(
+            "SELECT identifier FROM negatives"
+            " WHERE project = ? AND version = ? AND created >= ?",
+            (self.project, version, time.time() - self.max_age),
+        )
+        return {identifier for (identifier,) in rows}
+
+    def put_negative(self, identifier, version):
+        """
+        Records an identifier the index neither defines nor references.
+
+        Args:
+            identifier (str): The identifier that was queried.
+            version (str): The version it was queried against.
+        """
+        self._negatives.append((self.project, version, identifier, time.time()))
+        if len(self._queries) + len(self._negatives) >= self.batch_size:
+            self.flush()
+
+    def invalidate(self, version=None):
+        """
+        Drops the cached entries of the project, or only of one of its versions.
+
+        Args:
+            version (str): The version to drop, all versions if None.
+        """
+        for table in ("queries", "negatives"):
+            if version is None:
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE project = ?", (self.project,)
+                )
+            else:
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE project = ? AND version = ?",
+                    (self.project, version),
+                )
+        self.connection.commit()
+
+    def evict(self):
+        """
+        Removes expired entries and the least recently used ones above max_entries.
+        """
+        with self.connection:
+            for table in ("queries", "negatives"):
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE created < ?", (time.time() - self.max_age,)
+                )
+            (count,) = self.connection.execute("SELECT COUNT(*) FROM queries").fetchone()
+            if count > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM queries WHERE rowid IN"
+                    " (SELECT rowid FROM queries ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def flush(self):
+        """
+        Writes the buffered entries and the usage of the entries hit so far, in
+        one transaction.
+        """
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?, ?, ?)", self._queries
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO negatives VALUES (?, ?, ?, ?)", self._negatives
+            )
+            self.connection.executemany(
+                "UPDATE queries SET last_used = ?"
+                " WHERE project = ? AND version = ? AND identifier = ?",
+                [
+                    (now, self.project, version, identifier)
+                    for version, identifier in self._used
+                ],
+            )
+        self._queries.clear()
+        self._negatives.clear()
+        self._used.clear()
+
+    def stats(self):
+        """
+        Returns:
+            str: A summary of the cache hits and misses.
+        """
+        total = self.hits + self.misses
+        ratio = 100 * self.hits / total if total else 0
+        return f"{self.hits} hits, {self.misses} misses ({ratio:.1f}% hit rate)"
+
+    def close(self):
+        """
+        Flushes, evicts and closes the cache.
+        """
+        self.flush()
+        self.evict()
+        self.connection.close()
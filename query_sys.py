@@ -3,15 +3,17 @@ import os
 import re
 import cli
 import utilities
-from Trie import Trie
+from query_api import extract_file_identifiers
+from manifest import file_stamp, make_entry
+from source_scan import SourceScan, file_language, scan_file
+from source_cache import SourceCache, read_text as read_source
+from header_index import HeaderSymbolCache, syscalls_by_header
+from sysroot_index import seeded_include_graph
 from pygments import lex
-from collections import deque
 from pygments.lexers import CLexer
 
 
-SYSCALLS_EXTRACTED_FROM_C_CPP_FILES, FOUND_SYSCALLS, headers_set = set(), set(), set()
-INCLUDE_PATTERN = re.compile(r"#\s*include\s+<(.+?)>")
-DEFINE_PATTERN = re.compile(r"#\s*define\s+<(.+?)>")
+FILE_SECTIONS = ("includes", "headers", "syscalls", "lines")
 COMPILER_PATH = (
     "/opt/rta-vrte-linux/3.8.0/sysroots/aarch64-boschdenso-linux/usr/include"
 )
@@ -37,6 +39,22 @@ def x86_64_syscalls() -> set():
     return syscalls_1_2
 
 
+def x86_64_syscall_ids() -> dict():
+    """
+    Retrieves the number of every x86_64 system call from the 'strace_calls.txt' file.
+
+    Returns:
+        A dictionary mapping each system call to its number.
+    """
+    ids = {}
+    with open("strace_calls.txt", "r") as f:
+        for line in f:
+            match = re.search(r"(\d+)\s+(\w+)\s+", line)
+            if match:
+                ids.setdefault(match.group(2), int(match.group(1)))
+    return ids
+
+
 def find_c_cpp_files(directory: dict()) -> set():
     """
     Find all C and C++ files in the specified directory and its subdirectories.
@@ -77,60 +95,76 @@ def preprocess_and_save(repo_path: str()):
                 os.system(f"gcc -E {file_path} -o {output_file}")
 
 
-def find_words_in_file(file_path: str(), words_to_find: set()):
+def find_words_in_file(
+    file_path: str(), words_to_find: set(), source_cache=None, scan=None
+):
     """
     Finds and extracts words from a file that match the given set of words.
 
     Args:
         file_path (str): The path to the file to be searched.
         words_to_find (set): A set of words to be searched for in the file.
+        source_cache (SourceCache): The cache the file is read through, if any.
+        scan (SourceScan): The scan of the file, it is scanned here if None.
 
     Returns:
         set: A set of words extracted from the file that match the given set of words.
     """
-    with open(file_path, "r") as file:
-        for line in file:
-            words_in_line = line.split()
-            for word in words_in_line:
-                if word in words_to_find:
-                    SYSCALLS_EXTRACTED_FROM_C_CPP_FILES.add(word)
-    return SYSCALLS_EXTRACTED_FROM_C_CPP_FILES
+    if scan is None:
+        scan = scan_file(file_path, source_cache)
+    return scan.names().intersection(words_to_find)
 
 
-def syscall_hunter(syscalls: set(), c_cpp_file: dict()):
+def syscall_hunter(syscalls: set(), c_cpp_file: dict(), source_cache=None, scan=None):
     """
-    Searches for occurrences of specified syscalls in a C/C++ file.
+    Searches for occurrences of specified syscalls in a C/C++ file, i.e the
+    syscalls in call position in its code, outside comments and strings.
 
     Args:
         syscalls (set): A set of syscalls to search for.
         c_cpp_file (dict): A dictionary containing the file path of the C/C++ file.
+        source_cache (SourceCache): The cache the file is read through, if any.
+        scan (SourceScan): The scan of the file, it is scanned here if None.
 
     Returns:
         set: A set of found syscalls.
 
     """
-    with open(c_cpp_file, "r") as file:
-        code = file.read()
-    pattern = r"\b(" + "|".join(syscalls) + r")\s*\("
-    matches = re.findall(pattern, code)
-    FOUND_SYSCALLS.update(matches)
-    return FOUND_SYSCALLS
+    if scan is None:
+        scan = scan_file(c_cpp_file, source_cache)
+    return scan.call_sites().intersection(syscalls)
 
 
-# Using lexer
-def extract_included_headers(file_path):
+def extract_included_headers(file_path, source_cache=None):
     """
     Extracts the included headers from a given file.
 
     Args:
         file_path (str): The path to the file.
+        source_cache (SourceCache): The cache the file is read through, if any.
 
     Returns:
         list: A list of included headers.
 
     """
-    with open(file_path, "r") as file:
-        code = file.read()
+    return [header for header, _ in scan_file(file_path, source_cache).includes]
+
+
+# Using lexer
+def extract_included_headers_lexer(file_path, source_cache=None):
+    """
+    Extracts the included headers from a given file with the Pygments C lexer.
+    Kept as the reference implementation of extract_included_headers.
+
+    Args:
+        file_path (str): The path to the file.
+        source_cache (SourceCache): The cache the file is read through, if any.
+
+    Returns:
+        list: A list of included headers.
+
+    """
+    code = read_source(file_path, source_cache)
 
     lexer = CLexer()
     tokens = list(lex(code, lexer))
@@ -142,110 +176,108 @@ def extract_included_headers(file_path):
     return headers
 
 
-# TODO: test lexer
-# !Current wokring version
-def header_hunter_lexer(list_of_c_cpp_files: list()) -> set():
+def analyse_file(
+    file_path,
+    syscalls,
+    include_roots,
+    repo_root=None,
+    api=False,
+    sysroot_index=None,
+    source_options=None,
+):
     """
-    Extracts included headers from a list of C/C++ files and returns a set of unique headers.
+    Work unit of the analysis of a single source file. Reads, hashes and lexes
+    the file once, every extractor is given the same SourceScan, and returns
+    everything the reports need from it as a value, so units can run in any
+    process and be merged afterwards. Nothing is kept once the unit returns.
 
     Args:
-        list_of_c_cpp_files (list): A list of file paths to C/C++ files.
+        file_path (str): The path to the source file.
+        syscalls (frozenset): The syscall table.
+        include_roots (list): Ordered -I style include directories.
+        repo_root (str): The repository, headers inside it are recorded as dependencies.
+        api (bool): Also extract the macros and functions for the API query.
+        sysroot_index (str): Path of a sysroot index seeding the include graph.
+        source_options (dict): Keyword arguments of the SourceCache the file is
+            read through, i.e use_mmap.
 
     Returns:
-        set: A set of unique headers extracted from the files.
-
-    Raises:
-        FileNotFoundError: If a header file is not found.
-
-    """
-    q = deque()
-    processed_headers = set()  # to avoid processing the same header twice
-    for file_path in list_of_c_cpp_files:
-        try:
-            list_headers = extract_included_headers(file_path)
-            for i in list_headers:
-                if i not in processed_headers:
-                    q.append(i)
-                    headers_set.add(i)
-
-        except FileNotFoundError:
-            print(f"Header not found: {file_path}")
-    while q:
-        header = q.pop()
-        processed_headers.add(header)  # Mark header as processed
-        if header.endswith(".h"):
-            header_path = os.path.join(COMPILER_PATH, header)
-            if os.path.exists(header_path):
-                try:
-                    with open(header_path, "r") as header_file:
-                        for line in header_file:
-                            match = INCLUDE_PATTERN.match(line) or DEFINE_PATTERN.match(
-                                line
-                            )
-                            if match:
-                                header = match.group(1)
-                                if header not in processed_headers:
-                                    q.append(header)
-                                    headers_set.add(header)
-
-                except:
-                    print(f"Header file not found: {header_path}")
-    return headers_set
+        dict: The manifest entry of the file, its "results" hold the reached
+              "includes", the paths of the reached "headers", the "syscalls"
+              called, the "lines" of every syscall of the table and, with api,
+              the "api" identifiers. None if the file cannot be read.
+    """
+    source_cache = SourceCache(**(source_options or {}))
+    try:
+        stamp = file_stamp(file_path)
+        data = source_cache.read_bytes(file_path)
+    except FileNotFoundError:
+        print(f"File '{file_path}' not found.")
+        source_cache.close()
+        return None
+    try:
+        scan = SourceScan(data, file_language(file_path))
+        graph = seeded_include_graph(include_roots, sysroot_index)
+        reached, unresolved = graph.reachable(file_path, source_cache, scan.includes)
+        results = {
+            "includes": sorted(
+                {graph.display_name(header) for header in reached} | set(unresolved)
+            ),
+            "headers": sorted(reached),
+            "syscalls": sorted(syscall_hunter(syscalls, file_path, source_cache, scan)),
+            "lines": utilities.file_identifier_hits(
+                file_path, syscalls, source_cache, scan
+            ),
+        }
+        if api:
+            results["api"] = extract_file_identifiers(file_path, source_cache, scan)
+        return make_entry(
+            stamp, data, results, reached, repo_root, graph.probes(file_path, reached)
+        )
+    finally:
+        # Unmaps the file when use_mmap is set
+        source_cache.close()
 
 
 def searching_for_syscalls_in_headers(
-    syscalls_set: set(), headers_set: set(), header_directory: set
+    syscalls_set: set(), headers_set: set(), header_directory: set, symbol_cache=None
 ):
     """
     Searches for syscalls in header files.
 
+    Every header is tokenized once into its set of identifiers, so a syscall only
+    matches whole identifiers, and the per-header identifiers are reused from
+    the symbol cache while the header is unchanged.
+
     Args:
         syscalls_set (set): Set of syscalls to search for.
         headers_set (set): Set of header files to search in.
-        header_directory (set): Directory where the header files are located.
+        header_directory (str or list): Directory where the header files are located,
+            or the ordered include roots to look them up in.
+        symbol_cache (HeaderSymbolCache): Cache of the header identifiers, an
+            in-memory one is used if None.
 
     Returns:
         dict: A dictionary mapping each syscall to a set of headers where it is found.
     """
-    syscall_to_headers_mapping = {}
-    header_trie = Trie()
+    if isinstance(header_directory, str):
+        header_directory = [header_directory]
 
+    header_paths = {}
     for header in headers_set:
         if header.endswith(".h"):
-            header_path = os.path.join(header_directory, header)
-
-            if os.path.exists(header_path) and not header_trie.search(header_path):
-                with open(header_path, "r") as header_file:
-                    header_content = header_file.read()
-                    header_trie.insert(header_path)
-
-                    for syscall in syscalls_set:
-                        if syscall in header_content:
-                            if syscall not in syscall_to_headers_mapping:
-                                syscall_to_headers_mapping[syscall] = set()
-                            syscall_to_headers_mapping[syscall].add(header)
+            candidates = [os.path.join(root, header) for root in header_directory]
+            header_path = next(
+                (path for path in candidates if os.path.exists(path)), candidates[0]
+            )
+            if os.path.exists(header_path):
+                header_paths[header] = header_path
             else:
                 print(f"Header file not found: {header_path}")
-    return syscall_to_headers_mapping
-
-
-def find_line_number_in_c_cpp(c_cpp_files, word_to_find):
-    """
-    Find the line numbers in C/C++ files where a specific word is found.
-
-    Args:
-        c_cpp_files (list): A list of C/C++ file paths.
-        word_to_find (str): The word to search for in the files.
-
-    Returns:
-        dict: A dictionary where the keys are the file paths and the values are lists of line numbers
-              where the word is found in each file.
-    """
-    dict = {}
-    for file in c_cpp_files:
-        dict[file] = utilities.grep_exact(word_to_find, file)
-    return dict
+    return syscalls_by_header(
+        syscalls_set, header_paths, symbol_cache or HeaderSymbolCache(None)
+    )
 
 
 if __name__ == "__main__":
-    cli.run()
+    cli.main()
@@ -0,0 +1,279 @@
+import os
+import sqlite3
+
+DEFAULT_STORE_PATH = "results.sqlite"
+DEFAULT_BATCH_SIZE = 4096
+STORE_FORMAT = 1
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS repos ("
+    " id INTEGER PRIMARY KEY, name TEXT UNIQUE, path TEXT)",
+    "CREATE TABLE IF NOT EXISTS files ("
+    " id INTEGER PRIMARY KEY, repo_id INTEGER, path TEXT, UNIQUE (repo_id, path))",
+    "CREATE TABLE IF NOT EXISTS file_syscalls (file_id INTEGER, syscall TEXT)",
+    "CREATE TABLE IF NOT EXISTS reachable_syscalls (file_id INTEGER, syscall TEXT)",
+    "CREATE TABLE IF NOT EXISTS header_hits (repo_id INTEGER, syscall TEXT, header TEXT)",
+    "CREATE TABLE IF NOT EXISTS line_hits ("
+    " file_id INTEGER, syscall TEXT, line INTEGER, text TEXT)",
+    "CREATE TABLE IF NOT EXISTS api_calls ("
+    " repo_id INTEGER, version TEXT, symbol TEXT, type TEXT)",
+    "CREATE INDEX IF NOT EXISTS file_syscalls_syscall ON file_syscalls (syscall)",
+    "CREATE INDEX IF NOT EXISTS file_syscalls_file ON file_syscalls (file_id)",
+    "CREATE INDEX IF NOT EXISTS reachable_syscalls_syscall ON reachable_syscalls (syscall)",
+    "CREATE INDEX IF NOT EXISTS reachable_syscalls_file ON reachable_syscalls (file_id)",
+    "CREATE INDEX IF NOT EXISTS header_hits_syscall ON header_hits (syscall)",
+    "CREATE INDEX IF NOT EXISTS header_hits_repo ON header_hits (repo_id)",
+    "CREATE INDEX IF NOT EXISTS line_hits_syscall ON line_hits (syscall)",
+    "CREATE INDEX IF NOT EXISTS line_hits_file ON line_hits (file_id)",
+    "CREATE INDEX IF NOT EXISTS api_calls_symbol ON api_calls (symbol)",
+    "CREATE INDEX IF NOT EXISTS api_calls_repo ON api_calls (repo_id)",
+)
+FILE_TABLES = ("file_syscalls", "reachable_syscalls", "line_hits")
+REPO_TABLES = ("header_hits", "api_calls")
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_STORE_PATH, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Opens (or creates) an indexed SQLite store of the results of every
+        analysed repository, so they can be looked up across runs and repos.
+
+        begin drops the results of a previous run of a repository, its records
+        are then written in short transactions of batch_size records while it
+        is analysed. Each repository thread of a multi-repo run opens its own
+        store.
+
+        Args:
+            path (str): Location of the SQLite database.
+            batch_size (int): The number of records buffered before they are written.
+
+        Raises:
+            ValueError: If the store was written by a newer format.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        store_format = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if store_format > STORE_FORMAT:
+            self.connection.close()
+            raise ValueError(
+                f"{path} has the result store format {store_format}, this version "
+                f"reads format {STORE_FORMAT}. Remove it and run the analysis again "
+                "to rebuild it."
+            )
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+            self.connection.execute(f"PRAGMA user_version = {STORE_FORMAT}")
+        self.batch_size = batch_size
+        self.pending = {}
+        self.repo_ids = {}
+        self.file_ids = {}
+
+    def add(self, repo, record):
+        """
+        Buffers a record of a repository, see ResultWriter for the record kinds.
+        The buffer is written once it holds batch_size records.
+
+        Args:
+            repo (str): The name of the repository, registered by begin.
+            record (dict): The record.
+        """
+        records = self.pending.setdefault(repo, [])
+        records.append(record)
+        if len(records) >= self.batch_size:
+            self.commit(repo)
+
+    def add_api_calls(self, repo, api_calls, version):
+        """
+        Buffers the API calls of a repository in a version.
+
+        Args:
+            repo (str): The name of the repository.
+            api_calls (dict): symbol -> types of its definitions, as returned by
+                query_api.main.
+            version (str): The version they were resolved against.
+        """
+        self.add(repo, {"kind": "api_calls", "api_calls": api_calls, "version": version})
+
+    def begin(self, repo, repo_path):
+        """
+        Registers a repository and drops the results of its previous run.
+
+        Args:
+            repo (str): The name of the repository.
+            repo_path (str): The path to the repository.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO repos (name, path) VALUES (?, ?)", (repo, repo_path)
+            )
+            self.connection.execute(
+                "UPDATE repos SET path = ? WHERE name = ?", (repo_path, repo)
+            )
+            repo_id = self.connection.execute(
+                "SELECT id FROM repos WHERE name = ?", (repo,)
+            ).fetchone()[0]
+            for table in FILE_TABLES:
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE file_id IN"
+                    " (SELECT id FROM files WHERE repo_id = ?)",
+                    (repo_id,),
+                )
+            for table in REPO_TABLES:
+                self.connection.execute(f"DELETE FROM {table} WHERE repo_id = ?", (repo_id,))
+            self.connection.execute("DELETE FROM files WHERE repo_id = ?", (repo_id,))
+        self.repo_ids[repo] = repo_id
+        self.file_ids[repo] = {}
+        self.pending[repo] = []
+
+    def _file_id(self, repo, file_path):
+        """
+        Args:
+            repo (str): The name of the repository.
+            file_path (str): The source file.
+
+        Returns:
+            int: The id of the file, added to the repository on first use.
+        """
+        file_ids = self.file_ids[repo]
+        if file_path not in file_ids:
+            file_ids[file_path] = self.connection.execute(
+                "INSERT INTO files (repo_id, path) VALUES (?, ?)",
+                (self.repo_ids[repo], file_path),
+            ).lastrowid
+        return file_ids[file_path]
+
+    def commit(self, repo):
+        """
+        Writes the buffered records of a repository in a single transaction.
+
+        Args:
+            repo (str): The name of the repository, registered by begin.
+        """
+        records, self.pending[repo] = self.pending.get(repo, []), []
+        if not records:
+            return
+        repo_id = self.repo_ids[repo]
+        rows = {table: [] for table in FILE_TABLES + REPO_TABLES}
+        with self.connection:
+            for record in records:
+                kind = record["kind"]
+                if kind == "syscall_headers":
+                    rows["header_hits"].extend(
+                        (repo_id, record["syscall"], header) for header in record["headers"]
+                    )
+                elif kind == "api_calls":
+                    rows["api_calls"].extend(
+                        (repo_id, record["version"], symbol, symbol_type)
+                        for symbol, types in record["api_calls"].items()
+                        for symbol_type in types
+                    )
+                elif kind in ("file_syscalls", "file_reachable_syscalls"):
+                    table = "file_syscalls" if kind == "file_syscalls" else "reachable_syscalls"
+                    file_id = self._file_id(repo, record["file"])
+                    rows[table].extend((file_id, syscall) for syscall in record["syscalls"])
+                elif kind == "line_hit":
+                    rows["line_hits"].append(
+                        (
+                            self._file_id(repo, record["file"]),
+                            record["syscall"],
+                            record["line"],
+                            record["text"],
+                        )
+                    )
+            for table, table_rows in rows.items():
+                if table_rows:
+                    placeholders = ", ".join("?" * len(table_rows[0]))
+                    self.connection.executemany(
+                        f"INSERT INTO {table} VALUES ({placeholders})", table_rows
+                    )
+
+    def _select(self, query, parameters, repo=None):
+        """
+        Args:
+            query (str): A SELECT joined with repos as r, ending in a WHERE clause.
+            parameters (tuple): The parameters of the query.
+            repo (str): Only answer for this repository, if given.
+
+        Returns:
+            list: The rows, sorted.
+        """
+        if repo is not None:
+            query += " AND r.name = ?"
+            parameters += (repo,)
+        return sorted(self.connection.execute(query, parameters).fetchall())
+
+    def files_using(self, syscall, repo=None, reachable=False):
+        """
+        Args:
+            syscall (str): The syscall.
+            repo (str): Only answer for this repository, if given.
+            reachable (bool): Files reaching the syscall through their includes
+                instead of the files calling it.
+
+        Returns:
+            list: (repo, file) rows.
+        """
+        table = "reachable_syscalls" if reachable else "file_syscalls"
+        return self._select(
+            f"SELECT r.name, f.path FROM {table} s JOIN files f ON f.id = s.file_id"
+            " JOIN repos r ON r.id = f.repo_id WHERE s.syscall = ?",
+            (syscall,),
+            repo,
+        )
+
+    def line_hits(self, syscall, repo=None):
+        """
+        Args:
+            syscall (str): The syscall.
+            repo (str): Only answer for this repository, if given.
+
+        Returns:
+            list: (repo, file, line, text) rows.
+        """
+        return self._select(
+            "SELECT r.name, f.path, l.line, l.text FROM line_hits l"
+            " JOIN files f ON f.id = l.file_id JOIN repos r ON r.id = f.repo_id"
+            " WHERE l.syscall = ?",
+            (syscall,),
+            repo,
+        )
+
+    def headers_of(self, syscall, repo=None):
+        """
+        Args:
+            syscall (str): The syscall.
+            repo (str): Only answer for this repository, if given.
+
+        Returns:
+            list: (repo, header) rows of the headers mentioning the syscall.
+        """
+        return self._select(
+            "SELECT r.name, h.header FROM header_hits h JOIN repos r ON r.id = h.repo_id"
+            " WHERE h.syscall = ?",
+            (syscall,),
+            repo,
+        )
+
+    def api_symbol(self, symbol, repo=None):
+        """
+        Args:
+            symbol (str): The API symbol.
+            repo (str): Only answer for this repository, if given.
+
+        Returns:
+            list: (repo, version, type) rows of the repositories calling the symbol.
+        """
+        return self._select(
+            "SELECT r.name, a.version, a.type FROM api_calls a JOIN repos r ON r.id = a.repo_id"
+            " WHERE a.symbol = ?",
+            (symbol,),
+            repo,
+        )
+
+    def close(self):
+        """
+        Closes the store, the records not committed yet are dropped.
+        """
+        self.connection.close()
@@ -0,0 +1,227 @@
+import os
+import json
+import pprint
+import tempfile
+
+RESULTS_FILE = "results_{}.jsonl"
+
+
+class ResultWriter:
+    def __init__(self, repo_output_folder, repo_name, text_reports=True, store=None):
+        """
+        Streams the results of a repository as JSON Lines, one record per
+        header, syscall, source file and line hit, directly into its output
+        folder as they are produced. The text reports of the previous versions
+        are rendered alongside when text_reports is set.
+
+        Every record has a "kind":
+            {"kind": "syscall_headers", "syscall": ..., "headers": [...]}
+            {"kind": "header", "header": ...}
+            {"kind": "file_syscalls", "file": ..., "syscalls": [...]}
+            {"kind": "file_reachable_syscalls", "file": ..., "syscalls": [...]}
+            {"kind": "line_hit", "syscall": ..., "file": ..., "line": ..., "text": ...}
+
+        Args:
+            repo_output_folder (str): The output folder of the repository.
+            repo_name (str): The name of the repository, used in the file names.
+            text_reports (bool): Also write the pprint text reports.
+            store (ResultStore): Also writes every record to the result store, if given.
+        """
+        self.folder = repo_output_folder
+        self.repo_name = repo_name.replace(" ", "_")
+        self.text_reports = text_reports
+        self.store = store
+        self.path = os.path.join(repo_output_folder, RESULTS_FILE.format(self.repo_name))
+        self.records = open(self.path, "w")
+        self.syscalls_file = None
+        self.reachable_file = None
+        self.lines_file = None
+        self.line_reports = []
+        self.line_spool = None
+        self.line_offsets = {}
+
+    def _text_path(self, pattern):
+        """
+        Args:
+            pattern (str): The file name of a text report, with {} for the repo name.
+
+        Returns:
+            str: The path of the text report in the output folder.
+        """
+        return os.path.join(self.folder, pattern.format(self.repo_name))
+
+    def _write(self, record):
+        """
+        Args:
+            record (dict): The record to append.
+        """
+        self.records.write(json.dumps(record) + "\n")
+        if self.store is not None:
+            self.store.add(self.repo_name, record)
+
+    def syscall_headers(self, syscalls_headers_dict):
+        """
+        Writes which syscall is found in which header.
+
+        Args:
+            syscalls_headers_dict (dict): syscall -> set of headers.
+        """
+        for syscall, headers in syscalls_headers_dict.items():
+            self._write(
+                {"kind": "syscall_headers", "syscall": syscall, "headers": sorted(headers)}
+            )
+        if self.text_reports:
+            with open(self._text_path("user_output_{}.txt"), "w") as file:
+                pprint.pprint(syscalls_headers_dict, file)
+
+    def headers(self, headers):
+        """
+        Writes the headers reached by the sources.
+
+        Args:
+            headers (set): The header names.
+        """
+        for header in sorted(headers):
+            self._write({"kind": "header", "header": header})
+        if self.text_reports:
+            with open(self._text_path("Headers_{}.txt"), "w") as file:
+                pprint.pprint(headers, file)
+
+    def file_syscalls(self, file_path, syscalls):
+        """
+        Writes the syscalls called in a source file.
+
+        Args:
+            file_path (str): The source file.
+            syscalls (set): The syscalls found in it.
+        """
+        self._write(
+            {"kind": "file_syscalls", "file": file_path, "syscalls": sorted(syscalls)}
+        )
+        if self.text_reports:
+            if self.syscalls_file is None:
+                self.syscalls_file = open(
+                    self._text_path("syscalls_per_file_output_{}.txt"), "w"
+                )
+            file = self.syscalls_file
+            file.write("\n")
+            pprint.pprint(
+                f"        #######################################################",
+                file,
+            )
+            pprint.pprint(f"System calls found in the  {file_path}", file)
+            pprint.pprint(
+                f"""      ########################################################""",
+                file,
+            )
+            file.write("\n")
+            pprint.pprint(syscalls, file)
+
+    def file_reachable_syscalls(self, file_path, syscalls):
+        """
+        Writes the syscalls declared in the headers a source file reaches.
+
+        Args:
+            file_path (str): The source file.
+            syscalls (list): The reachable syscalls.
+        """
+        self._write(
+            {"kind": "file_reachable_syscalls", "file": file_path, "syscalls": syscalls}
+        )
+        if self.text_reports:
+            if self.reachable_file is None:
+                self.reachable_file = open(
+                    self._text_path("reachable_syscalls_per_file_output_{}.txt"), "w"
+                )
+            pprint.pprint({file_path: syscalls}, self.reachable_file)
+
+    def file_line_hits(self, file_path, hits):
+        """
+        Spools the line hits of a source file to a temporary file, until
+        line_hits writes those of a syscall.
+
+        Args:
+            file_path (str): The source file.
+            hits (dict): identifier -> list of [line number, stripped line].
+        """
+        if self.line_spool is None:
+            self.line_spool = tempfile.TemporaryFile()
+        self.line_spool.seek(0, os.SEEK_END)
+        for word, lines in hits.items():
+            self.line_offsets.setdefault(word, []).append(self.line_spool.tell())
+            self.line_spool.write((json.dumps([file_path, lines]) + "\n").encode())
+
+    def line_hits(self, syscall):
+        """
+        Writes the lines where a syscall is found, as spooled by file_line_hits.
+
+        Args:
+            syscall (str): The syscall.
+        """
+        hits = {}
+        for offset in self.line_offsets.pop(syscall, []):
+            self.line_spool.seek(offset)
+            file_path, lines = json.loads(self.line_spool.readline())
+            hits[file_path] = dict(lines)
+        for file_path, lines in hits.items():
+            for line, text in lines.items():
+                self._write(
+                    {
+                        "kind": "line_hit",
+                        "syscall": syscall,
+                        "file": file_path,
+                        "line": line,
+                        "text": text,
+                    }
+                )
+        if self.text_reports:
+            self._line_report(
+                {
+                    f"{syscall} is found in file {file_path}": lines
+                    for file_path, lines in hits.items()
+                }
+            )
+
+    def _line_report(self, report):
+        """
+        Appends a report to line_number_output_*.txt, rendered as pprint renders
+        the list of every report. The reports are held until the list is too
+        long for one line, each one is written as it comes afterwards.
+
+        Args:
+            report (dict): The line hits of a syscall, per file.
+        """
+        if self.lines_file is None:
+            self.line_reports.append(report)
+            if len(pprint.saferepr(self.line_reports)) <= 80:
+                return
+            self.lines_file = open(self._text_path("line_number_output_{}.txt"), "w")
+            reports, self.line_reports = self.line_reports, []
+            self.lines_file.write("[")
+            self.lines_file.write(",\n ".join(pprint.pformat([r])[1:-1] for r in reports))
+            return
+        self.lines_file.write(",\n " + pprint.pformat([report])[1:-1])
+
+    def close(self):
+        """
+        Flushes the records and the text reports.
+        """
+        self.records.close()
+        if self.syscalls_file is not None:
+            self.syscalls_file.close()
+            self.syscalls_file = None
+        if self.reachable_file is not None:
+            self.reachable_file.close()
+            self.reachable_file = None
+        if self.lines_file is not None:
+            self.lines_file.write("]\n")
+            self.lines_file.close()
+            self.lines_file = None
+        elif self.line_reports:
+            with open(self._text_path("line_number_output_{}.txt"), "w") as file:
+                pprint.pprint(self.line_reports, file)
+        self.line_reports = []
+        if self.line_spool is not None:
+            self.line_spool.close()
+            self.line_spool = None
+        self.line_offsets = {}
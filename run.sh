@@ -12,10 +12,10 @@ do
     export LXR_DATA_DIR=$LXR_PROJ_DIR/$PROJ/data
     # Provide necessary arguments for output, mrepo, compiler, api, and xrs
     # Be mindful of the spacing and line breaks
-    echo "Please select the version for $libname:" 
+    echo "Please select the version(s) for $libname, separated by comma:" 
     bash /home/bsp_projects/elixir/script.sh list-tags
     read -p "> " version
-    ./query_sys.py  \
+    ./query_sys.py run \
         --output=./output-$libname \
         --mrepo=$path \
         --compiler=/usr/include/ \
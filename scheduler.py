@@ -0,0 +1,159 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from source_cache import discover_sources
+
+
+def repo_cost(repo_path):
+    """
+    Estimates the cost of analysing a repository from a quick scan.
+
+    Args:
+        repo_path (str): The path to the repository.
+
+    Returns:
+        tuple: The total size in bytes and the number of its C/C++ files.
+    """
+    size = 0
+    sources = discover_sources(repo_path)
+    for path in sources:
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            pass
+    return size, len(sources)
+
+
+class SharedPool:
+    def __init__(self, jobs):
+        """
+        A process pool shared by all the repositories of a run. Every repository
+        queues its file units on the same pool, so a worker that is done with
+        one repository picks up the remaining files of the others.
+
+        The workers are started here, before any repository thread exists.
+
+        Args:
+            jobs (int): Number of worker processes.
+        """
+        self.jobs = jobs
+        self.pool = multiprocessing.Pool(jobs)
+        self.start_time = time.perf_counter()
+        self.stop_time = None
+        self.busy = 0.0
+        self.units = 0
+        self.lock = threading.Lock()
+
+    def map(self, function, items, chunksize=1):
+        """
+        Runs a work unit over items on the pool, accounting the busy time.
+
+        Args:
+            function (callable): The work unit, must be picklable.
+            items (list): The arguments of the units.
+            chunksize (int): Units handed to a worker at once.
+
+        Yields:
+            The results, in the order of items.
+        """
+        for result, elapsed in self.pool.imap(
+            _TimedUnit(function), items, chunksize=chunksize
+        ):
+            with self.lock:
+                self.busy += elapsed
+                self.units += 1
+            yield result
+
+    def utilisation(self):
+        """
+        Returns:
+            float: The share of the worker time spent running units while the
+                   pool was open.
+        """
+        elapsed = (self.stop_time or time.perf_counter()) - self.start_time
+        return self.busy / max(elapsed * self.jobs, 1e-9)
+
+    def close(self):
+        """
+        Stops the workers.
+        """
+        self.stop_time = time.perf_counter()
+        self.pool.close()
+        self.pool.join()
+
+
+class _TimedUnit:
+    def __init__(self, function):
+        """
+        Picklable wrapper measuring how long a pool worker runs a work unit.
+
+        Args:
+            function (callable): The work unit.
+        """
+        self.function = function
+
+    def __call__(self, item):
+        start_time = time.perf_counter()
+        result = self.function(item)
+        return result, time.perf_counter() - start_time
+
+
+def run_repos(repo_list, mrepo, analyse, jobs):
+    """
+    Analyses several repositories on a shared process pool. Repositories are
+    started largest first (by bytes, then file count), each one driven by its
+    own thread, and their file units are spread over all the workers.
+
+    Args:
+        repo_list (list): The names of the repositories.
+        mrepo (str): The directory containing the repositories.
+        analyse (callable): Called with a repository name and the SharedPool.
+        jobs (int): Number of worker processes.
+
+    Returns:
+        list: (repo name, size in bytes, file count, wall time in seconds) in the
+              order the repositories were started.
+    """
+    costs = {repo: repo_cost(os.path.join(mrepo, repo)) for repo in repo_list}
+    order = sorted(repo_list, key=lambda repo: costs[repo], reverse=True)
+    wall_times = {}
+
+    def timed_analyse(repo):
+        start_time = time.perf_counter()
+        try:
+            analyse(repo, shared_pool)
+        finally:
+            wall_times[repo] = time.perf_counter() - start_time
+
+    shared_pool = SharedPool(jobs)
+    start_time = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(order), jobs)) as threads:
+            futures = [threads.submit(timed_analyse, repo) for repo in order]
+            for future in futures:
+                future.result()
+    finally:
+        shared_pool.close()
+    summary = [(repo, *costs[repo], wall_times.get(repo, 0.0)) for repo in order]
+    print_summary(summary, time.perf_counter() - start_time, shared_pool)
+    return summary
+
+
+def print_summary(summary, elapsed, shared_pool):
+    """
+    Prints the wall time of every repository and the utilisation of the workers.
+
+    Args:
+        summary (list): As returned by run_repos.
+        elapsed (float): The wall time of the whole run in seconds.
+        shared_pool (SharedPool): The pool the repositories ran on.
+    """
+    print("* Scheduling summary (largest first):")
+    for repo, size, files, wall_time in summary:
+        print(f"  {repo}: {files} files, {size / 2**20:.1f} MB, {wall_time:.2f} seconds")
+    print(
+        f"* {shared_pool.units} file units on {shared_pool.jobs} workers in {elapsed:.2f} seconds,"
+        f" worker utilisation {100 * shared_pool.utilisation():.0f}%"
+    )
@@ -0,0 +1,148 @@
+import os
+import mmap
+
+SOURCE_EXTENSIONS = (".c", ".cpp")
+
+
+def discover_sources(repo_path: str()) -> list():
+    """
+    Finds all C and C++ files of a repository in a single walk.
+
+    Args:
+        repo_path (str): The path to the repository.
+
+    Returns:
+        list: The sorted absolute paths of all C and C++ files found.
+    """
+    sources = []
+    for root, _, files in os.walk(repo_path):
+        for filename in files:
+            if filename.endswith(SOURCE_EXTENSIONS):
+                sources.append(os.path.abspath(os.path.join(root, filename)))
+    return sorted(sources)
+
+
+def decode_source(data):
+    """
+    Decodes the content of a source file like open(path, "r") would, replacing
+    undecodable bytes instead of failing.
+
+    Args:
+        data (bytes): The raw content of the file.
+
+    Returns:
+        str: The decoded text with universal newlines.
+    """
+    text = bytes(data).decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class SourceCache:
+    def __init__(self, use_mmap=False):
+        """
+        Holds the contents of the files read by a work unit, so its stages read
+        a file from disk once, until close releases them.
+
+        Args:
+            use_mmap (bool): Map the files into memory instead of reading them.
+        """
+        self.use_mmap = use_mmap
+        self.entries = {}
+        self.size = 0
+
+    def _load(self, path):
+        """
+        Reads (or maps) a file from disk.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            bytes: The content of the file, an mmap object if use_mmap is set.
+        """
+        with open(path, "rb") as file:
+            if self.use_mmap and os.fstat(file.fileno()).st_size:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return file.read()
+
+    def read_bytes(self, path):
+        """
+        Returns the raw content of a file, read from disk the first time.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            bytes: The content of the file, an mmap object if use_mmap is set.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        if path not in self.entries:
+            self.entries[path] = self._load(path)
+            self.size += len(self.entries[path])
+        return self.entries[path]
+
+    def read_text(self, path):
+        """
+        Returns the decoded content of a file, read from disk the first time.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            str: The content of the file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        return decode_source(self.read_bytes(path))
+
+    def close(self):
+        """
+        Releases the cached contents.
+        """
+        for data in self.entries.values():
+            if isinstance(data, mmap.mmap):
+                data.close()
+        self.entries.clear()
+        self.size = 0
+
+
+def read_text(path, source_cache=None):
+    """
+    Reads a source file through the cache when one is given, undecodable
+    bytes are replaced as by decode_source.
+
+    Args:
+        path (str): The path to the file.
+        source_cache (SourceCache): The cache the file is read through, or None to read from disk.
+
+    Returns:
+        str: The content of the file.
+    """
+    if source_cache is not None:
+        return source_cache.read_text(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        return file.read()
+
+
+def read_lines(path, source_cache=None):
+    """
+    Iterates over the lines of a source file, through the cache when one is
+    given. Undecodable bytes are replaced as by decode_source.
+
+    Args:
+        path (str): The path to the file.
+        source_cache (SourceCache): The cache the file is read through, or None to read from disk.
+
+    Yields:
+        str: The lines of the file.
+    """
+    if source_cache is not None:
+        yield from source_cache.read_text(path).split("\n")
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as file:
+            yield from file
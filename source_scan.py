@@ -0,0 +1,395 @@
+import re
+import mmap
+import bisect
+import functools
+from array import array
+from pygments.lexers import CLexer
+from include_graph import DIRECTIVE_INCLUDE_PATTERN, strip_comments
+
+# Comments, directives, string and character literals. Every branch starts
+# with a literal character so the regex engine can skip ahead to candidates.
+LEXEME_PATTERN = re.compile(
+    rb"""
+    /(?:/[^\n]*|\*.*?(?:\*/|\Z))
+    |\#(?:\\\n|/\*.*?\*/|[^\n])*
+    |"(?:(?<=R")([^()\\\s]{0,16})\(.*?\)\1"|(?:\\.|[^"\\\n])*"?)
+    |'(?:\\.|[^'\\\n])*'
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+# A parameter list opens a body when a brace follows it, after C++ qualifiers
+# or after the parameter declarations of a K&R definition, i.e "(a) int a; {"
+STRUCTURE_PATTERN = re.compile(
+    rb"\b([A-Za-z_]\w*)\s*\("
+    rb"|(\)\s*(?:(?:const|noexcept|override|final|volatile)\b\s*)*\{"
+    rb"|\)(?:\s*[A-Za-z_][^;{}()]*;)+\s*\{)"
+    rb"|([{}])"
+)
+CALL_PATTERN = re.compile(rb"\b([A-Za-z_]\w*)\s*\(")
+NAME_PATTERN = re.compile(rb"\b[A-Za-z_]\w*")
+NEWLINE_PATTERN = re.compile(rb"\n")
+WORD_BYTE_PATTERN = re.compile(rb"\w")
+DEFINE_PATTERN = re.compile(rb"\s*#\s*define\s+(\w+)(\([^)]*\))?")
+# Every byte but the newline becomes a space, so offsets and lines still hold
+BLANK_TABLE = bytes(10 if byte == 10 else 32 for byte in range(256))
+
+C_KEYWORDS = {
+    "auto", "break", "case", "char", "const", "continue", "default", "do",
+    "double", "else", "enum", "extern", "float", "for", "goto", "if", "inline",
+    "int", "long", "register", "restrict", "return", "short", "signed",
+    "sizeof", "static", "struct", "switch", "typedef", "union", "unsigned",
+    "void", "volatile", "while", "_Alignas", "_Alignof", "_Atomic", "_Bool",
+    "_Complex", "_Generic", "_Imaginary", "_Noreturn", "_Static_assert",
+    "_Thread_local", "asm", "__asm__", "__attribute__", "__inline",
+    "__inline__", "__restrict", "__restrict__", "__extension__", "typeof",
+    "__typeof__", "defined",
+}  # fmt: skip
+CPP_KEYWORDS = C_KEYWORDS | {
+    "alignas", "alignof", "and", "bool", "catch", "char16_t", "char32_t",
+    "char8_t", "class", "co_await", "co_return", "co_yield", "concept",
+    "consteval", "constexpr", "constinit", "const_cast", "decltype", "delete",
+    "dynamic_cast", "explicit", "export", "false", "final", "friend",
+    "mutable", "namespace", "new", "noexcept", "not", "nullptr", "operator",
+    "or", "override", "private", "protected", "public", "reinterpret_cast",
+    "requires", "static_assert", "static_cast", "template", "this",
+    "thread_local", "throw", "true", "try", "typeid", "typename", "using",
+    "virtual", "wchar_t", "xor",
+}  # fmt: skip
+# The types Pygments tags as keywords, so they are not taken for API names
+TYPE_NAMES = CLexer.stdlib_types | CLexer.c99_types | CLexer.linux_types
+
+
+def blank_lexemes(code):
+    """
+    Blanks out the comments, string literals and preprocessor directives of
+    C/C++ code. Every byte keeps its offset, so positions in the cleaned code
+    are positions in the file.
+
+    Args:
+        code (bytes): The code to clean, bytes or any buffer such as an mmap.
+
+    Returns:
+        tuple: The cleaned code and the (offset, directive) pairs removed from it.
+    """
+    directives = []
+
+    def blank(match):
+        lexeme = match.group()
+        if lexeme[:1] == b"#":
+            directives.append((match.start(), lexeme))
+        return lexeme.translate(BLANK_TABLE)
+
+    return LEXEME_PATTERN.sub(blank, code), directives
+
+
+def newline_table(data):
+    """
+    Args:
+        data (bytes): The content of a file, bytes or any buffer such as an mmap.
+
+    Returns:
+        array: The offsets of the newlines of the file, in order.
+    """
+    return array("q", [match.start() for match in NEWLINE_PATTERN.finditer(data)])
+
+
+@functools.lru_cache(maxsize=4096)
+def identifier_pattern(identifier):
+    """
+    Args:
+        identifier (str): An identifier.
+
+    Returns:
+        re.Pattern: The bytes pattern matching the identifier when it is not
+                    followed by a word character. It starts with the literal so
+                    the regex engine searches it quickly, the start of the word
+                    is checked by the caller.
+    """
+    return re.compile(rb"%s(?!\w)" % re.escape(identifier.encode()))
+
+
+def word_starts(pattern, code):
+    """
+    Args:
+        pattern (re.Pattern): A pattern from identifier_pattern.
+        code (bytes): The code to search.
+
+    Yields:
+        int: The offsets where the identifier starts a word.
+    """
+    for match in pattern.finditer(code):
+        start = match.start()
+        if start == 0 or not WORD_BYTE_PATTERN.match(code, start - 1):
+            yield start
+
+
+class SourceScan:
+    def __init__(self, data, language="C++"):
+        """
+        Single lexing pass over the raw bytes of a source file, collecting what
+        every analysis stage needs from it. Comments and string literals are
+        blanked out, the bodies of #define directives are kept apart and
+        scanned like code. The file is never decoded: names are ASCII and line
+        numbers come from a newline offset table.
+
+        The includes and macros are collected here, the identifiers, call sites
+        and line positions are computed from the cleaned code when first asked.
+
+        Args:
+            data (bytes): The content of the file, bytes or any buffer such as an mmap.
+            language (str): The programming language of the code ("C++" or "C").
+        """
+        self.keywords = (CPP_KEYWORDS if language == "C++" else C_KEYWORDS) | TYPE_NAMES
+        self.code, directives = blank_lexemes(data)
+        self.newlines = newline_table(data)
+        self.includes = []
+        self.macros = []
+        self.macro_bodies = []
+        for offset, directive in directives:
+            match = DIRECTIVE_INCLUDE_PATTERN.match(
+                strip_comments(
+                    directive.replace(b"\\\n", b" ").decode("utf-8", "replace"), False
+                )[0]
+            )
+            if match:
+                self.includes.append([match.group(1) or match.group(2), not match.group(1)])
+                continue
+            match = DEFINE_PATTERN.match(directive)
+            if match:
+                self.macros.append(match.group(1).decode())
+                body = blank_lexemes(directive[match.end() :])[0]
+                self.macro_bodies.append((offset + match.end(), body))
+        self._names = None
+        self._call_sites = None
+        self._structure = None
+        self._positions = {}
+
+    def _decode(self, names):
+        """
+        Args:
+            names (iterable): Identifiers as bytes.
+
+        Returns:
+            set: The identifiers as str, without the keywords and builtin types.
+        """
+        return {name.decode() for name in names}.difference(self.keywords)
+
+    def names(self):
+        """
+        Returns:
+            set: Every identifier of the code and the macro bodies that is not
+                 a keyword or builtin type.
+        """
+        if self._names is None:
+            names = set(NAME_PATTERN.findall(self.code))
+            for _, body in self.macro_bodies:
+                names.update(NAME_PATTERN.findall(body))
+            self._names = self._decode(names)
+        return self._names
+
+    def call_sites(self):
+        """
+        Returns:
+            set: The names followed by "(", i.e calls, declarations and definitions.
+        """
+        if self._call_sites is None:
+            calls = set(CALL_PATTERN.findall(self.code))
+            for _, body in self.macro_bodies:
+                calls.update(CALL_PATTERN.findall(body))
+            self._call_sites = self._decode(calls)
+        return self._call_sites
+
+    def structure(self):
+        """
+        Tells the call sites apart by following the braces of the code: names
+        in call position inside a body (or a macro body) are calls, the others
+        declare a function, defined when the parameter list is followed by a
+        body, directly or after K&R parameter declarations.
+
+        Returns:
+            tuple: The sets of calls, declarations and definitions.
+        """
+        if self._structure is not None:
+            return self._structure
+        calls, declarations, defined = set(), set(), set()
+        scopes, bodies, pending = [], 0, None
+        for name, body_open, brace in STRUCTURE_PATTERN.findall(self.code):
+            if name:
+                if bodies:
+                    calls.add(name)
+                elif name.decode() not in self.keywords:
+                    declarations.add(name)
+                    pending = name
+            elif body_open or brace == b"{":
+                body = bool(bodies or body_open)
+                if body and pending and not bodies:
+                    defined.add(pending)
+                scopes.append(body)
+                bodies += body
+                pending = None
+            elif scopes:
+                bodies -= scopes.pop()
+        for _, body in self.macro_bodies:
+            calls.update(CALL_PATTERN.findall(body))
+        self._structure = (
+            self._decode(calls),
+            self._decode(declarations),
+            self._decode(defined),
+        )
+        return self._structure
+
+    def line_number(self, offset):
+        """
+        Args:
+            offset (int): A byte offset in the file.
+
+        Returns:
+            int: The 1-based line of the offset.
+        """
+        return bisect.bisect_right(self.newlines, offset) + 1
+
+    def line_span(self, line_number):
+        """
+        Args:
+            line_number (int): A 1-based line number.
+
+        Returns:
+            tuple: The start and end offsets of the line without its newline,
+                   the end is None on the last line.
+        """
+        start = self.newlines[line_number - 2] + 1 if line_number > 1 else 0
+        end = self.newlines[line_number - 1] if line_number <= len(self.newlines) else None
+        return start, end
+
+    def positions(self, identifiers):
+        """
+        Finds the lines of the identifiers, searching the cleaned code for each
+        one of them that appears in the file.
+
+        Args:
+            identifiers (iterable): The identifiers to locate.
+
+        Returns:
+            dict: identifier -> sorted line numbers, for the identifiers found.
+        """
+        found = {}
+        for identifier in self.names().intersection(identifiers):
+            if identifier not in self._positions:
+                pattern = identifier_pattern(identifier)
+                lines = {
+                    self.line_number(start) for start in word_starts(pattern, self.code)
+                }
+                for offset, body in self.macro_bodies:
+                    lines.update(
+                        self.line_number(offset + start)
+                        for start in word_starts(pattern, body)
+                    )
+                self._positions[identifier] = sorted(lines)
+            found[identifier] = self._positions[identifier]
+        return found
+
+
+def file_language(file_path):
+    """
+    Args:
+        file_path (str): The path to the source file.
+
+    Returns:
+        str: "C" for .c files, "C++" otherwise.
+    """
+    return "C" if file_path.endswith(".c") else "C++"
+
+
+def read_buffer(file_path, source_cache=None):
+    """
+    Returns the raw content of a source file without decoding it: from the
+    cache when one is given, otherwise the file is memory-mapped.
+
+    Args:
+        file_path (str): The path to the source file.
+        source_cache (SourceCache): The cache the file is read through, if any.
+
+    Returns:
+        bytes: The content of the file, an mmap object when it was mapped.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if source_cache is not None:
+        return source_cache.read_bytes(file_path)
+    with open(file_path, "rb") as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""
+
+
+def release_buffer(data, source_cache=None):
+    """
+    Unmaps a buffer returned by read_buffer, the cache owns its own buffers.
+
+    Args:
+        data (bytes): The buffer.
+        source_cache (SourceCache): The cache it was read through, if any.
+    """
+    if source_cache is None and isinstance(data, mmap.mmap):
+        data.close()
+
+
+def scan_file(file_path, source_cache=None):
+    """
+    Reads and scans a source file. Nothing is kept between calls: callers
+    running several extractors on a file scan it once and pass the scan along,
+    see analyse_file.
+
+    Args:
+        file_path (str): The path to the source file.
+        source_cache (SourceCache): The cache the file is read through, if any.
+
+    Returns:
+        SourceScan: The scan of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    data = read_buffer(file_path, source_cache)
+    try:
+        return SourceScan(data, file_language(file_path))
+    finally:
+        release_buffer(data, source_cache)
+
+
+def line_hits(file_path, identifiers, source_cache=None, scan=None):
+    """
+    Finds the lines of a source file where each identifier appears in its code.
+    Only the lines with a hit are decoded.
+
+    Args:
+        file_path (str): The path to the source file.
+        identifiers (iterable): The identifiers to locate, i.e the syscalls.
+        source_cache (SourceCache): The cache the file is read through, if any.
+        scan (SourceScan): The scan of the file, it is scanned here if None.
+
+    Returns:
+        dict: identifier -> list of [line number, stripped line].
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if scan is None:
+        scan = scan_file(file_path, source_cache)
+    positions = scan.positions(identifiers)
+    if not positions:
+        return {}
+    data = read_buffer(file_path, source_cache)
+    try:
+        hits = {}
+        for identifier, lines in positions.items():
+            hits[identifier] = []
+            for line_number in lines:
+                start, end = scan.line_span(line_number)
+                text = data[start:end].decode("utf-8", "replace").strip()
+                hits[identifier].append([line_number, text])
+        return hits
+    finally:
+        release_buffer(data, source_cache)
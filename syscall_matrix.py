@@ -0,0 +1,204 @@
+import gzip
+import json
+import base64
+import threading
+
+MATRIX_FORMAT = 1
+MATRIX_FILE = "syscall_matrix.json.gz"
+
+
+def syscall_bitset(syscalls, syscall_ids):
+    """
+    Args:
+        syscalls (iterable): Syscall names, the unknown ones are ignored.
+        syscall_ids (dict): syscall -> number.
+
+    Returns:
+        int: The bitset with the bit of the number of every syscall set.
+    """
+    bits = 0
+    for syscall in syscalls:
+        number = syscall_ids.get(syscall)
+        if number is not None:
+            bits |= 1 << number
+    return bits
+
+
+def bitset_syscalls(bits, syscall_names):
+    """
+    Args:
+        bits (int): A bitset.
+        syscall_names (dict): number -> syscall.
+
+    Returns:
+        list: The names of the syscalls set, by number.
+    """
+    return [
+        syscall for number, syscall in sorted(syscall_names.items()) if bits >> number & 1
+    ]
+
+
+class SyscallMatrix:
+    def __init__(self, syscall_ids):
+        """
+        Bitset matrix of the syscalls used by every repository and source file
+        of a run. Each row is an int whose bit n is set when the syscall number
+        n of strace_calls.txt is used, so set questions across repositories are
+        answered with bitwise operations.
+
+        A repository has one row for each of its files and one row, with no
+        file, for the union of its files.
+
+        Args:
+            syscall_ids (dict): syscall -> number, see x86_64_syscall_ids.
+        """
+        self.ids = dict(syscall_ids)
+        self.names = {number: syscall for syscall, number in self.ids.items()}
+        self.width = (max(self.ids.values(), default=-1) + 8) // 8
+        self.rows = []
+        self.bits = []
+        self.index = {}
+        self.lock = threading.Lock()
+
+    def bitset(self, syscalls):
+        """
+        Args:
+            syscalls (iterable): Syscall names, the unknown ones are ignored.
+
+        Returns:
+            int: The bitset of the syscalls.
+        """
+        return syscall_bitset(syscalls, self.ids)
+
+    def syscalls(self, bits):
+        """
+        Args:
+            bits (int): A bitset.
+
+        Returns:
+            list: The names of the syscalls set, by number.
+        """
+        return bitset_syscalls(bits, self.names)
+
+    def add_repo(self, repo, file_syscalls):
+        """
+        Adds the rows of a repository, safe to call from the threads of a
+        multi-repo run.
+
+        Args:
+            repo (str): The name of the repository.
+            file_syscalls (dict): file path relative to the repository -> syscalls.
+        """
+        rows = [(file_path, self.bitset(found)) for file_path, found in file_syscalls.items()]
+        union = 0
+        for _, bits in rows:
+            union |= bits
+        with self.lock:
+            for file_path, bits in rows + [(None, union)]:
+                self.index[(repo, file_path)] = len(self.rows)
+                self.rows.append([repo, file_path])
+                self.bits.append(bits)
+
+    def row(self, repo, file_path=None):
+        """
+        Args:
+            repo (str): The name of the repository.
+            file_path (str): A file of the repository, None for the whole repository.
+
+        Returns:
+            int: The bitset of the row.
+
+        Raises:
+            KeyError: If the repository or file is not in the matrix.
+        """
+        return self.bits[self.index[(repo, file_path)]]
+
+    def repos(self):
+        """
+        Returns:
+            list: The names of the repositories, in the order they were added.
+        """
+        return [repo for repo, file_path in self.rows if file_path is None]
+
+    def unknown(self, syscalls):
+        """
+        Args:
+            syscalls (iterable): Syscall names.
+
+        Returns:
+            list: The names that are not in the syscall table of the matrix.
+        """
+        return [syscall for syscall in syscalls if syscall not in self.ids]
+
+    def users(self, syscalls, files=False):
+        """
+        Finds the rows using every given syscall.
+
+        Args:
+            syscalls (iterable): The syscall names.
+            files (bool): Answer with files instead of repositories.
+
+        Returns:
+            list: The matching [repo, file] rows, file is None for repositories.
+
+        Raises:
+            KeyError: If a syscall is not in the syscall table, its empty mask
+                would match every row.
+        """
+        unknown = self.unknown(syscalls)
+        if unknown:
+            raise KeyError(f"Unknown syscalls: {', '.join(unknown)}")
+        wanted = self.bitset(syscalls)
+        return [
+            row
+            for row, bits in zip(self.rows, self.bits)
+            if (row[1] is not None) == files and bits & wanted == wanted
+        ]
+
+    def save(self, path):
+        """
+        Writes the matrix as gzipped JSON, the rows packed little endian in
+        self.width bytes each.
+
+        Args:
+            path (str): The file to write.
+        """
+        packed = b"".join(bits.to_bytes(self.width, "little") for bits in self.bits)
+        with gzip.open(path, "wt") as file:
+            json.dump(
+                {
+                    "format": MATRIX_FORMAT,
+                    "syscalls": self.ids,
+                    "rows": self.rows,
+                    "bits": base64.b64encode(packed).decode(),
+                },
+                file,
+                separators=(",", ":"),
+            )
+
+
+def load_matrix(path):
+    """
+    Loads a matrix written by SyscallMatrix.save.
+
+    Args:
+        path (str): The matrix file.
+
+    Returns:
+        SyscallMatrix: The loaded matrix.
+
+    Raises:
+        ValueError: If the file has an unsupported format.
+    """
+    with gzip.open(path, "rt") as file:
+        data = json.load(file)
+    if data.get("format") != MATRIX_FORMAT:
+        raise ValueError(f"Unsupported syscall matrix format in {path}")
+    matrix = SyscallMatrix(data["syscalls"])
+    packed = base64.b64decode(data["bits"])
+    for number, (repo, file_path) in enumerate(data["rows"]):
+        start = number * matrix.width
+        matrix.index[(repo, file_path)] = number
+        matrix.rows.append([repo, file_path])
+        matrix.bits.append(int.from_bytes(packed[start : start + matrix.width], "little"))
+    return matrix
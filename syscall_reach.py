@@ -0,0 +1,57 @@
+from syscall_matrix import bitset_syscalls, syscall_bitset
+
+
+class ReachableSyscalls:
+    def __init__(self, graph, syscall_ids, symbol_cache, index=None):
+        """
+        Answers which syscalls a source file can reach through its includes, by
+        combining the syscall bitsets of the headers its work unit reached. The
+        bitset of a header is computed once, so headers shared by many files
+        cost once and no file is read again.
+
+        Args:
+            graph (IncludeGraph): The include graph of the run, names the headers.
+            syscall_ids (dict): syscall -> number, see x86_64_syscall_ids.
+            symbol_cache (HeaderSymbolCache): The cache of header identifiers.
+            index (SysrootIndex): The sysroot index, answers for the headers it covers.
+        """
+        self.graph = graph
+        self.ids = syscall_ids
+        self.names = {number: syscall for syscall, number in syscall_ids.items()}
+        self.symbol_cache = symbol_cache
+        self.index = index
+        self.declared_bits = {}
+
+    def declared(self, header_path):
+        """
+        Args:
+            header_path (str): The normalized path of a header.
+
+        Returns:
+            int: The bitset of the syscalls the header itself declares.
+        """
+        if header_path not in self.declared_bits:
+            name = self.graph.display_name(header_path)
+            if self.index is not None and self.index.covers(name):
+                found = self.index.identifiers.get(self.index.numbers[name], ())
+            else:
+                try:
+                    found = self.symbol_cache.identifiers(header_path)
+                except OSError:
+                    found = ()
+            self.declared_bits[header_path] = syscall_bitset(found, self.ids)
+        return self.declared_bits[header_path]
+
+    def file(self, header_paths):
+        """
+        Args:
+            header_paths (iterable): The headers a source file reaches, directly
+                or not, i.e the "headers" results of its work unit.
+
+        Returns:
+            list: The syscalls declared in the headers the file reaches, by number.
+        """
+        bits = 0
+        for header_path in header_paths:
+            bits |= self.declared(header_path)
+        return bitset_syscalls(bits, self.names)
@@ -0,0 +1,211 @@
+import os
+import gzip
+import json
+from include_graph import get_include_graph
+from header_index import HeaderSymbolCache
+
+INDEX_FORMAT = 1
+HEADER_EXTENSIONS = (".h", ".hh", ".hpp", ".hxx")
+SYSROOT_INDEXES = {}
+SEEDED_GRAPHS = set()
+
+
+def find_headers(sysroot):
+    """
+    Finds all the header files below a sysroot include directory.
+
+    Args:
+        sysroot (str): The include directory, i.e the --compiler option.
+
+    Returns:
+        list: The sorted normalized paths of the headers.
+    """
+    headers = []
+    for root, _, files in os.walk(sysroot):
+        for filename in files:
+            if filename.endswith(HEADER_EXTENSIONS):
+                headers.append(os.path.normpath(os.path.join(root, filename)))
+    return sorted(headers)
+
+
+def build_sysroot_index(sysroot, syscalls, include_dirs=(), symbol_cache=None):
+    """
+    Scans a sysroot once and collects its include edges and the syscalls each
+    header declares.
+
+    Args:
+        sysroot (str): The include directory, i.e the --compiler option.
+        syscalls (set): The syscall table.
+        include_dirs (list): Include directories searched before the sysroot.
+        symbol_cache (HeaderSymbolCache): Cache of the header identifiers.
+
+    Returns:
+        dict: The index, see write_sysroot_index.
+    """
+    roots = list(include_dirs) + [sysroot]
+    graph = get_include_graph(roots)
+    symbol_cache = symbol_cache or HeaderSymbolCache(None)
+    headers = find_headers(sysroot)
+    ids = {path: number for number, path in enumerate(headers)}
+    names = [graph.display_name(path) for path in headers]
+
+    includes, identifiers, syscall_headers = {}, {}, {}
+    for path in headers:
+        edges = graph.header_edges(path)
+        if edges:
+            includes[ids[path]] = [ids.get(edge, edge) for edge in edges]
+        try:
+            declared = sorted(symbol_cache.identifiers(path).intersection(syscalls))
+        except OSError:
+            continue
+        if declared:
+            identifiers[ids[path]] = declared
+            for syscall in declared:
+                syscall_headers.setdefault(syscall, []).append(ids[path])
+    return {
+        "format": INDEX_FORMAT,
+        "roots": graph.roots,
+        "headers": names,
+        "paths": headers,
+        "includes": includes,
+        "identifiers": identifiers,
+        "syscall_headers": syscall_headers,
+    }
+
+
+def write_sysroot_index(index, index_path):
+    """
+    Writes a sysroot index as compact gzipped JSON.
+
+    The index holds the header names (relative to their root) and paths, header -> include
+    edges and header -> declared syscall identifiers by header number, and the
+    reverse syscall -> headers mapping.
+
+    Args:
+        index (dict): The index built by build_sysroot_index.
+        index_path (str): The file to write.
+    """
+    with gzip.open(index_path, "wt") as file:
+        json.dump(index, file, separators=(",", ":"))
+
+
+class SysrootIndex:
+    def __init__(self, index):
+        """
+        Read-only view of a sysroot index.
+
+        Args:
+            index (dict): The decoded index.
+        """
+        self.roots = index["roots"]
+        self.headers = index["headers"]
+        self.paths = index["paths"]
+        self.numbers = {name: number for number, name in enumerate(self.headers)}
+        self.identifiers = {
+            int(number): set(declared)
+            for number, declared in index["identifiers"].items()
+        }
+        self.includes = {
+            int(number): edges for number, edges in index["includes"].items()
+        }
+        self.syscall_headers = index["syscall_headers"]
+
+    def path(self, header):
+        """
+        Args:
+            header (int or str): A header number, or the path of a header outside
+                the sysroot.
+
+        Returns:
+            str: The absolute path of the header.
+        """
+        return self.paths[header] if isinstance(header, int) else header
+
+    def covers(self, header):
+        """
+        Args:
+            header (str): A header name as in the "includes" of analyse_file.
+
+        Returns:
+            bool: Whether the header was indexed.
+        """
+        return header in self.numbers
+
+    def syscalls_in_headers(self, syscalls_set, headers_set):
+        """
+        Maps syscalls to the indexed headers declaring them, without reading any header.
+
+        Args:
+            syscalls_set (set): The syscalls to look for.
+            headers_set (set): The header names to consider.
+
+        Returns:
+            dict: A dictionary mapping each syscall to a set of header names.
+        """
+        mapping = {}
+        for header in headers_set:
+            number = self.numbers.get(header)
+            for syscall in self.identifiers.get(number, ()):
+                if syscall in syscalls_set:
+                    mapping.setdefault(syscall, set()).add(header)
+        return mapping
+
+    def seed_graph(self, graph):
+        """
+        Fills an include graph with the indexed edges so sysroot headers are not
+        parsed again. Only done when the graph searches the same roots.
+
+        Args:
+            graph (IncludeGraph): The graph of the current run.
+        """
+        if graph.roots != self.roots:
+            return
+        for number, edges in self.includes.items():
+            graph.edges.setdefault(
+                self.path(number), [self.path(edge) for edge in edges]
+            )
+        for path in self.paths:
+            graph.edges.setdefault(path, [])
+
+
+def load_sysroot_index(index_path):
+    """
+    Loads a sysroot index once per process. Loading it before the worker pool
+    is created shares it read-only with the forked workers.
+
+    Args:
+        index_path (str): The file written by write_sysroot_index.
+
+    Returns:
+        SysrootIndex: The loaded index.
+
+    Raises:
+        ValueError: If the file has an unsupported format.
+    """
+    if index_path not in SYSROOT_INDEXES:
+        with gzip.open(index_path, "rt") as file:
+            index = json.load(file)
+        if index.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported sysroot index format in {index_path}")
+        SYSROOT_INDEXES[index_path] = SysrootIndex(index)
+    return SYSROOT_INDEXES[index_path]
+
+
+def seeded_include_graph(roots, index_path=None):
+    """
+    Returns the include graph of a list of roots, seeded once per process with
+    the edges of a sysroot index.
+
+    Args:
+        roots (list): The include directories, searched in order.
+        index_path (str): The sysroot index, if any.
+
+    Returns:
+        IncludeGraph: The graph for these roots.
+    """
+    graph = get_include_graph(roots)
+    key = (tuple(graph.roots), index_path)
+    if index_path and key not in SEEDED_GRAPHS:
+        load_sysroot_index(index_path).seed_graph(graph)
+        SEEDED_GRAPHS.add(key)
+    return graph
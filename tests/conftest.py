@@ -0,0 +1,79 @@
+import os
+import sys
+import dbm
+import pytest
+
+# The modules of the tool live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_elixir_data(
+    data_dir, versions, definitions=None, references=None, documented=None
+):
+    """
+    Writes a small Elixir data directory with the standard dbm module, so
+    ElixirData can be exercised without an Elixir installation.
+
+    Args:
+        data_dir (str): The directory to create.
+        versions (dict): version -> {blob id: path}.
+        definitions (dict): ident -> [(blob id, type letter, line, family)].
+        references (dict): ident -> [(blob id, "line,line", family)].
+        documented (dict): ident -> [(blob id, "line", family)].
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    entries = {
+        "versions.db": {
+            version: b"".join(
+                b"%d %s\n" % (blob, path.encode())
+                for blob, path in sorted(paths.items())
+            )
+            for version, paths in versions.items()
+        },
+        "definitions.db": {
+            ident: b",".join(
+                b"%d%s%d%s" % (blob, kind.encode(), line, family.encode())
+                for blob, kind, line, family in defs
+            )
+            + b"#"
+            + "".join(sorted({d[3] for d in defs})).encode()
+            for ident, defs in (definitions or {}).items()
+        },
+        "references.db": {
+            ident: b"".join(
+                b"%d:%s:%s\n" % (blob, lines.encode(), family.encode())
+                for blob, lines, family in refs
+            )
+            for ident, refs in (references or {}).items()
+        },
+        "doccomments.db": {
+            ident: b"".join(
+                b"%d:%s:%s\n" % (blob, lines.encode(), family.encode())
+                for blob, lines, family in docs
+            )
+            for ident, docs in (documented or {}).items()
+        },
+    }
+    for name, content in entries.items():
+        with dbm.open(os.path.join(data_dir, name), "n") as database:
+            for key, value in content.items():
+                database[key.encode()] = value
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    An Elixir data directory with two versions, set as $LXR_DATA_DIR.
+    """
+    path = str(tmp_path / "data")
+    write_elixir_data(
+        path,
+        {"v1": {1: "/include/fcntl.h", 2: "/src/open.c"}, "v2": {3: "/src/open.c"}},
+        definitions={
+            "open": [(1, "p", 10, "C"), (2, "f", 20, "C")],
+            "O_RDONLY": [(1, "d", 5, "C")],
+        },
+        references={"open": [(2, "30,31", "C")]},
+    )
+    monkeypatch.setenv("LXR_DATA_DIR", path)
+    return path
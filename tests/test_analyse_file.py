@@ -0,0 +1,66 @@
+import mmap
+import utilities
+import source_cache
+from query_sys import analyse_file
+
+SYSCALLS = frozenset({"open", "read", "write", "close"})
+
+
+def write_repo(tmp_path):
+    include = tmp_path / "include"
+    include.mkdir()
+    (include / "fcntl.h").write_text("int open(const char *path, int flags);\n")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.c").write_text(
+        '#include <fcntl.h>\n'
+        'int main(void) {\n'
+        '    /* write(1, "", 0); */\n'
+        '    int fd = open("a", 0);\n'
+        '    return close(fd);\n'
+        '}\n'
+    )
+    (repo / "empty.c").write_text("")
+    return str(include), str(repo)
+
+
+def record_mapped(monkeypatch):
+    """
+    Records the type of every buffer a SourceCache holds when it is closed.
+    """
+    kinds = []
+    close = source_cache.SourceCache.close
+
+    def recording_close(self):
+        kinds.extend(type(data) for data in self.entries.values())
+        close(self)
+
+    monkeypatch.setattr(source_cache.SourceCache, "close", recording_close)
+    return kinds
+
+
+def test_analyse_file_reads_through_mmap(tmp_path, monkeypatch):
+    include, repo = write_repo(tmp_path)
+    kinds = record_mapped(monkeypatch)
+    entry = analyse_file(
+        f"{repo}/a.c", SYSCALLS, [include], repo, source_options={"use_mmap": True}
+    )
+    assert kinds == [mmap.mmap]
+    assert entry["results"]["syscalls"] == ["close", "open"]
+    assert entry["results"]["lines"]["open"] == [[4, 'int fd = open("a", 0);']]
+
+
+def test_pipeline_uses_the_source_options(tmp_path, monkeypatch):
+    include, repo = write_repo(tmp_path)
+    sources = [f"{repo}/a.c", f"{repo}/empty.c"]
+    plain = dict(utilities.analyse_sources(sources, SYSCALLS, [include], repo))
+
+    kinds = record_mapped(monkeypatch)
+    mapped = dict(
+        utilities.analyse_sources(
+            sources, SYSCALLS, [include], repo, source_options={"use_mmap": True}
+        )
+    )
+    # Empty files cannot be mapped and are read
+    assert kinds == [mmap.mmap, bytes]
+    assert mapped == plain
@@ -0,0 +1,74 @@
+import random
+import pytest
+from api_parsing import remove_pattern_from_list
+
+VOCABULARY = [
+    "Symbol Definitions:\n",
+    "Symbol References:\n",
+    "Documented in:\n",
+    "\n",
+    "^^ do_open\n",
+    "^^ do_close\n",
+    "^^ fp\n",
+    "^^ other\n",
+    "fs/open.c: 1122 (type: function)\n",
+    "include/linux/fs.h: 2510 (type: prototype)\n",
+]
+
+
+def previous_filter(lst, false_positives):
+    """
+    The list based loop remove_pattern_from_list replaced, kept as the reference.
+    """
+    i = 0
+    FP = [f"^^ {identifier}\n" for identifier in false_positives]
+    while i < len(lst) - 1:
+        if (
+            lst[i] == "Symbol References:\n"
+            and lst[i + 1] == "\n"
+            or lst[i] == "Symbol Definitions:\n"
+            and lst[i + 1] == "\n"
+            or lst[i] == "Documented in:\n"
+            and lst[i + 1] == "\n"
+        ):
+            del lst[i : i + 2]
+        elif lst[i] in FP:
+            del lst[i : i + 1]
+        else:
+            i += 1
+    return lst
+
+
+def test_empty_sections_and_false_positives_are_dropped():
+    lines = [
+        "^^ do_open\n",
+        "Symbol Definitions:\n",
+        "fs/open.c: 1122 (type: function)\n",
+        "\n",
+        "Symbol References:\n",
+        "\n",
+        "Documented in:\n",
+        "\n",
+        "^^ fp\n",
+        "Symbol Definitions:\n",
+        "\n",
+        "Symbol References:\n",
+        "\n",
+        "Documented in:\n",
+        "\n",
+    ]
+    assert list(remove_pattern_from_list(lines, {"fp"})) == [
+        "^^ do_open\n",
+        "Symbol Definitions:\n",
+        "fs/open.c: 1122 (type: function)\n",
+        "\n",
+    ]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_the_previous_filter(seed):
+    generator = random.Random(seed)
+    lines = generator.choices(VOCABULARY, k=generator.randrange(30))
+    false_positives = set(generator.sample(["do_open", "do_close", "fp"], 2))
+    expected = previous_filter(list(lines), false_positives)
+    assert list(remove_pattern_from_list(iter(lines), false_positives)) == expected
@@ -0,0 +1,92 @@
+import os
+import cli
+import api_parsing
+import elixir_data
+import query_api
+import query_cache
+from types import SimpleNamespace
+from click.testing import CliRunner
+
+
+def test_lookup_filters_by_version(data_dir):
+    index = elixir_data.ElixirData(data_dir)
+    try:
+        record = index.lookup("open", "v1")
+        assert [symbol.type for symbol in record.definitions] == ["prototype", "function"]
+        assert record.references == [elixir_data.Symbol("/src/open.c", "30,31", None)]
+        assert index.lookup("open", "v2").definitions == []
+    finally:
+        index.close()
+
+
+def test_data_backend_records_are_classified_without_text(data_dir):
+    items = ["open", "O_RDONLY", "missing"]
+    results = dict(zip(items, query_api.data_results(items, "v1", 1)))
+    record, ok = results["open"]
+    assert ok and isinstance(record, elixir_data.IdentRecord)
+    assert api_parsing.symbol_types(record) == {"prototype", "function"}
+    assert not api_parsing.is_false_positive(record)
+    assert api_parsing.symbol_types(results["O_RDONLY"][0]) == {"define"}
+    assert api_parsing.is_false_positive(results["missing"][0])
+
+    # The text of query.py is classified the same
+    text = query_api.ident_output(record)
+    assert api_parsing.symbol_types(text) == api_parsing.symbol_types(record)
+    assert api_parsing.is_false_positive(query_api.ident_output(results["missing"][0]))
+
+
+def test_unresolved_identifiers_are_skipped_until_they_expire(
+    data_dir, tmp_path, monkeypatch
+):
+    queried = []
+
+    def recording_results(items, version, jobs):
+        queried.append(list(items))
+        return query_api.data_results(items, version, jobs)
+
+    monkeypatch.setitem(query_api.QUERY_BACKENDS, "data", recording_results)
+    cache_path = str(tmp_path / "queries.sqlite")
+
+    def run():
+        return dict(
+            query_api.query_identifiers(["missing", "open"], "v1", cache_path, 1, "data")
+        )
+
+    results = run()
+    assert queried == [["missing", "open"]]
+    assert api_parsing.is_false_positive(results["missing"])
+    cache = query_cache.QueryCache(cache_path)
+    assert cache.negatives("v1") == {"missing"}
+    assert cache.negatives("v2") == set()
+    cache.close()
+
+    # The negative entry is skipped, the positive one answered by the cache
+    results = run()
+    assert queried[1] == []
+    assert results["missing"] == api_parsing.EMPTY_IDENT_OUTPUT
+    assert api_parsing.symbol_types(results["open"]) == {"prototype", "function"}
+
+    # Both are queried again once they are older than max_age
+    later = query_cache.time.time() + query_cache.DEFAULT_MAX_AGE + 1
+    monkeypatch.setattr(query_cache, "time", SimpleNamespace(time=lambda: later))
+    run()
+    assert queried[2] == ["missing", "open"]
+
+
+def test_data_backend_requires_lxr_data_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("LXR_DATA_DIR", raising=False)
+    (tmp_path / "repos").mkdir()
+    result = CliRunner().invoke(
+        cli.run,
+        [
+            "--mrepo", str(tmp_path / "repos"),
+            "--compiler", str(tmp_path),
+            "--version", "v1",
+            "--output", str(tmp_path / "out"),
+            "--api",
+            "--query-backend", "data",
+        ],
+    )  # fmt: skip
+    assert result.exit_code == 2
+    assert "LXR_DATA_DIR" in result.output
+    assert not os.path.exists(tmp_path / "out")
@@ -0,0 +1,22 @@
+import sqlite3
+from header_index import HeaderSymbolCache, syscalls_by_header
+
+
+def test_concurrent_caches_do_not_lock_each_other(tmp_path):
+    path = str(tmp_path / "headers.sqlite")
+    header = tmp_path / "fcntl.h"
+    header.write_text("int openat(int dirfd);\nint fcntl(int fd, int cmd);\n")
+    first = HeaderSymbolCache(path)
+    assert syscalls_by_header({"openat", "read"}, {"fcntl.h": str(header)}, first) == {
+        "openat": {"fcntl.h"}
+    }
+    # A concurrent repository tokenizing its headers while the first one runs
+    connection = sqlite3.connect(path, timeout=0)
+    connection.execute("INSERT OR REPLACE INTO headers VALUES ('other.h', 0, 0, 'read')")
+    connection.commit()
+    connection.close()
+    first.close()
+    second = HeaderSymbolCache(path)
+    assert "fcntl" in second.identifiers(str(header))
+    assert second.tokenized == 0
+    second.close()
@@ -0,0 +1,60 @@
+import pytest
+from include_graph import IncludeGraph
+
+
+@pytest.fixture
+def roots(tmp_path):
+    for root in ("first", "second"):
+        (tmp_path / root).mkdir()
+    (tmp_path / "first" / "a.h").write_text('#include "b.h"\n#include <leaf.h>\n')
+    (tmp_path / "first" / "b.h").write_text('#include "c.h"\n')
+    (tmp_path / "first" / "c.h").write_text('#include "a.h"\n')
+    (tmp_path / "first" / "leaf.h").write_text("int leaf;\n")
+    (tmp_path / "second" / "leaf.h").write_text("#include <never.h>\n")
+    (tmp_path / "second" / "only.h").write_text("#include <leaf.h>\n")
+    return tmp_path
+
+
+def test_closure_of_a_cycle(roots):
+    graph = IncludeGraph([str(roots / "first")])
+    a, b, c, leaf = (str(roots / "first" / name) for name in ("a.h", "b.h", "c.h", "leaf.h"))
+    assert graph.closure(a) == {a, b, c, leaf}
+    # Every header of the cycle shares the closure of the component
+    assert graph.closure(b) is graph.closure(a)
+    assert graph.closure(c) is graph.closure(a)
+    assert graph.closure(leaf) == frozenset()
+
+
+def test_quoted_includes_are_looked_up_next_to_the_file_first(roots, tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "leaf.h").write_text("int local_leaf;\n")
+    source = tmp_path / "src" / "main.c"
+    source.write_text('#include "leaf.h"\n#include <leaf.h>\n#include "only.h"\n')
+    graph = IncludeGraph([str(roots / "first"), str(roots / "second")])
+    resolved, unresolved = graph.direct_includes(str(source))
+    assert resolved == [
+        str(tmp_path / "src" / "leaf.h"),
+        str(roots / "first" / "leaf.h"),
+        str(roots / "second" / "only.h"),
+    ]
+    assert unresolved == []
+    # The roots are searched in order, first/leaf.h shadows second/leaf.h
+    reached, _ = graph.reachable(str(source))
+    assert str(roots / "second" / "leaf.h") not in reached
+
+
+def test_closures_are_memoized(roots, monkeypatch):
+    graph = IncludeGraph([str(roots / "first")])
+    a = str(roots / "first" / "a.h")
+    graph.closure(a)
+    parsed = []
+    monkeypatch.setattr(graph, "direct_includes", lambda path: parsed.append(path))
+    assert graph.closure(a) == graph.closure(str(roots / "first" / "b.h"))
+    assert parsed == []
+
+
+def test_edges_of_a_header_that_is_not_utf8(tmp_path):
+    (tmp_path / "latin1.h").write_bytes(b"/* \xe9t\xe9 */\n#include <leaf.h>\n")
+    (tmp_path / "leaf.h").write_text("int leaf;\n")
+    graph = IncludeGraph([str(tmp_path)])
+    assert graph.header_edges(str(tmp_path / "latin1.h")) == [str(tmp_path / "leaf.h")]
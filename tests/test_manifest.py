@@ -0,0 +1,72 @@
+import os
+import pytest
+import utilities
+import include_graph
+from manifest import RepoManifest
+
+SYSCALLS = frozenset({"open", "stat"})
+
+
+@pytest.fixture
+def layout(tmp_path):
+    for root in ("first", "second"):
+        (tmp_path / root / "sys").mkdir(parents=True)
+    (tmp_path / "second" / "sys" / "stat.h").write_text("int stat(const char *path);\n")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.c").write_text('#include "local.h"\nint main(void) { return 0; }\n')
+    (repo / "local.h").write_text("#define LOCAL 1\n")
+    (repo / "b.c").write_text('#include "gen2.h"\nint main(void) { return 0; }\n')
+    return tmp_path
+
+
+def analyse(layout, monkeypatch):
+    """
+    Runs the per-file analysis of the repository like a new run would, with a
+    fresh include graph and the manifest of the previous run.
+    """
+    monkeypatch.setattr(include_graph, "INCLUDE_GRAPHS", {})
+    repo = str(layout / "repo")
+    manifest = RepoManifest(str(layout / "manifest.json"), {"roots": 2})
+    sources = [os.path.join(repo, "a.c"), os.path.join(repo, "b.c")]
+    results = utilities.analyse_sources(
+        sources,
+        SYSCALLS,
+        [str(layout / "first"), str(layout / "second")],
+        repo,
+        manifest=manifest,
+    )
+    results = {os.path.basename(path): entry for path, entry in results}
+    manifest.save()
+    return manifest, results
+
+
+def test_unchanged_files_are_reused(layout, monkeypatch):
+    analyse(layout, monkeypatch)
+    manifest, _ = analyse(layout, monkeypatch)
+    assert (manifest.reused, manifest.reprocessed) == (2, 0)
+
+
+def test_changed_repository_header_reprocesses(layout, monkeypatch):
+    analyse(layout, monkeypatch)
+    (layout / "repo" / "local.h").write_text("#define LOCAL 22\n")
+    manifest, _ = analyse(layout, monkeypatch)
+    assert (manifest.reused, manifest.reprocessed) == (1, 1)
+
+
+def test_unresolved_include_that_appears_reprocesses(layout, monkeypatch):
+    _, results = analyse(layout, monkeypatch)
+    assert results["b.c"]["includes"] == ["gen2.h"]
+    (layout / "repo" / "gen2.h").write_text("#include <sys/stat.h>\n")
+    manifest, results = analyse(layout, monkeypatch)
+    assert (manifest.reused, manifest.reprocessed) == (1, 1)
+    assert str(layout / "second" / "sys" / "stat.h") in results["b.c"]["headers"]
+
+
+def test_shadowing_header_reprocesses(layout, monkeypatch):
+    (layout / "repo" / "gen2.h").write_text("#include <sys/stat.h>\n")
+    analyse(layout, monkeypatch)
+    (layout / "first" / "sys" / "stat.h").write_text("int stat(void);\n")
+    manifest, results = analyse(layout, monkeypatch)
+    assert (manifest.reused, manifest.reprocessed) == (1, 1)
+    assert str(layout / "first" / "sys" / "stat.h") in results["b.c"]["headers"]
@@ -0,0 +1,70 @@
+import pytest
+import cli
+from click.testing import CliRunner
+from result_store import ResultStore
+from syscall_matrix import SyscallMatrix
+
+
+@pytest.fixture
+def matrix_path(tmp_path):
+    matrix = SyscallMatrix({"read": 0, "write": 1, "ptrace": 101})
+    matrix.add_repo("a", {"x.c": {"read", "ptrace"}, "y.c": {"write"}})
+    matrix.add_repo("b", {"z.c": {"read"}})
+    path = str(tmp_path / "matrix.json.gz")
+    matrix.save(path)
+    return path
+
+
+def query(*args):
+    return CliRunner().invoke(cli.main, ["query", *args])
+
+
+def test_users(matrix_path):
+    result = query("--matrix", matrix_path, "users", "read")
+    assert result.exit_code == 0
+    assert result.stdout.splitlines()[:2] == ["a", "b"]
+    result = query("--matrix", matrix_path, "users", "ptrace", "--files")
+    assert result.stdout.startswith("a/x.c\n")
+
+
+def test_users_rejects_unknown_syscalls(matrix_path):
+    result = query("--matrix", matrix_path, "users", "read", "ptrce")
+    assert result.exit_code == 2
+    assert "unknown syscalls ptrce" in result.output
+    assert "\na\n" not in result.output
+
+
+def test_matrix_users_raises_on_unknown_syscalls():
+    matrix = SyscallMatrix({"read": 0})
+    matrix.add_repo("a", {"x.c": {"read"}})
+    with pytest.raises(KeyError):
+        matrix.users(["ptrce"])
+
+
+def test_api_from_the_store(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    store = ResultStore(path)
+    store.begin("r1", "/repos/r1")
+    store.add_api_calls("r1", {"do_open": {"function"}}, "v1")
+    store.commit("r1")
+    store.close()
+    result = query("--store", path, "api", "do_open")
+    assert result.exit_code == 0
+    assert result.stdout.startswith("r1 v1 function\n")
+    result = query("--store", str(tmp_path / "missing.sqlite"), "api", "do_open")
+    assert result.exit_code == 2
+
+
+def test_answer_time_goes_to_stderr(matrix_path):
+    result = query("--matrix", matrix_path, "counts")
+    assert result.exit_code == 0
+    assert "Answered in" not in result.stdout
+    assert "Answered in" in result.stderr
+
+
+def test_options_without_a_command_are_passed_to_run():
+    result = CliRunner().invoke(cli.main, ["--mrepo", "./repos", "-h"])
+    assert result.exit_code == 0
+    assert result.output.startswith("Usage: main run [OPTIONS]")
+    result = CliRunner().invoke(cli.main, ["-h"])
+    assert "Commands:" in result.output
@@ -0,0 +1,23 @@
+import sqlite3
+import query_cache
+
+
+def test_concurrent_caches_do_not_lock_each_other(tmp_path):
+    path = str(tmp_path / "queries.sqlite")
+    first = query_cache.QueryCache(path, project="p", batch_size=2)
+    first.put("open", "v1", "output")
+    # A second repository opening the cache while the first one queries
+    second = query_cache.QueryCache(path, project="p")
+    second.put_negative("missing", "v1")
+    second.close()
+    first.put("close", "v1", "output")
+    connection = sqlite3.connect(path, timeout=0)
+    connection.execute("INSERT OR REPLACE INTO projects VALUES ('q', '')")
+    connection.commit()
+    assert connection.execute("SELECT COUNT(*) FROM queries").fetchone() == (2,)
+    connection.close()
+    first.close()
+    reopened = query_cache.QueryCache(path, project="p")
+    assert reopened.get("close", "v1") == "output"
+    assert reopened.negatives("v1") == {"missing"}
+    reopened.close()
@@ -0,0 +1,34 @@
+import sqlite3
+import pytest
+import result_store
+
+
+def test_refuses_newer_format(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA user_version = {result_store.STORE_FORMAT + 1}")
+    connection.close()
+    with pytest.raises(ValueError, match="rebuild"):
+        result_store.ResultStore(path)
+
+
+def test_writes_every_batch(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    store = result_store.ResultStore(path, batch_size=2)
+    store.begin("r1", "/repos/r1")
+    store.add("r1", {"kind": "file_syscalls", "file": "/repos/r1/a.c", "syscalls": ["read"]})
+    reader = result_store.ResultStore(path)
+    assert reader.files_using("read") == []
+    store.add("r1", {"kind": "file_syscalls", "file": "/repos/r1/b.c", "syscalls": ["read"]})
+    # The batch is committed, a concurrent store sees it and is not locked out
+    assert reader.files_using("read") == [("r1", "/repos/r1/a.c"), ("r1", "/repos/r1/b.c")]
+    store.add(
+        "r1",
+        {"kind": "line_hit", "syscall": "read", "file": "/repos/r1/a.c", "line": 3, "text": "read(fd);"},
+    )
+    store.commit("r1")
+    assert reader.line_hits("read") == [("r1", "/repos/r1/a.c", 3, "read(fd);")]
+    store.begin("r1", "/repos/r1")
+    assert reader.files_using("read") == []
+    store.close()
+    reader.close()
@@ -0,0 +1,26 @@
+import json
+import pprint
+import pytest
+from result_writer import ResultWriter
+
+
+@pytest.mark.parametrize("files", [0, 1, 40])
+def test_line_report_matches_pprint(tmp_path, files):
+    writer = ResultWriter(str(tmp_path), "r1")
+    for number in range(files):
+        file_path = f"/repos/r1/f{number}.c"
+        writer.file_line_hits(file_path, {"read": [[number + 1, "read(fd);"]], "open": []})
+    for syscall in ("read", "open", "close"):
+        writer.line_hits(syscall)
+    writer.close()
+    expected = [
+        {
+            f"read is found in file /repos/r1/f{number}.c": {number + 1: "read(fd);"}
+            for number in range(files)
+        },
+        {f"open is found in file /repos/r1/f{number}.c": {} for number in range(files)},
+        {},
+    ]
+    assert (tmp_path / "line_number_output_r1.txt").read_text() == pprint.pformat(expected) + "\n"
+    records = [json.loads(line) for line in open(tmp_path / "results_r1.jsonl")]
+    assert [record["line"] for record in records] == list(range(1, files + 1))
@@ -0,0 +1,39 @@
+from source_scan import SourceScan
+
+CODE = b"""#include <unistd.h>
+#define CLOSE(fd) close(fd)
+struct ops { int (*read)(int); };
+int open_file(const char *path);
+static int helper(int fd) { if (fd) { return write(fd, "mmap(", 1); } return 0; }
+/* socket(AF_INET) */
+int main(void) { CLOSE(helper(0)); return 0; }
+"""
+
+
+def test_structure_tells_calls_declarations_and_definitions_apart():
+    calls, declarations, defined = SourceScan(CODE, "C").structure()
+    assert calls == {"write", "helper", "CLOSE", "close"}
+    assert declarations == {"open_file", "helper", "main"}
+    assert defined == {"helper", "main"}
+
+
+def test_structure_of_kr_definitions():
+    code = b"""int f(a) int a; { return ioctl(a); }
+int g(fd, buf) int fd; char *buf;
+{
+    return read(fd, buf, 1);
+}
+int h();
+"""
+    calls, declarations, defined = SourceScan(code, "C").structure()
+    assert calls == {"ioctl", "read"}
+    assert declarations == {"f", "g", "h"}
+    assert defined == {"f", "g"}
+
+
+def test_prototypes_followed_by_declarations_are_not_definitions():
+    code = b"void f(void); int x; struct s { int y; };\nint k(void) const { return stat(0); }\n"
+    calls, declarations, defined = SourceScan(code, "C++").structure()
+    assert calls == {"stat"}
+    assert declarations == {"f", "k"}
+    assert defined == {"k"}
@@ -1,22 +1,28 @@
-import re
 import os
 import sys
 import time
-import json
 import click
+import functools
 import shutil
 import pprint
 import logging
 import utilities
 import subprocess
-from query_api import main as run_query_api
+from source_cache import discover_sources
+from source_scan import line_hits
+from header_index import DEFAULT_INDEX_PATH, HeaderSymbolCache
+from sysroot_index import load_sysroot_index, seeded_include_graph
+from syscall_reach import ReachableSyscalls
+from manifest import RepoManifest, manifest_path
+from result_writer import ResultWriter
+from result_store import ResultStore
+from query_api import analyse_versions as run_query_api
 from query_sys import (
     x86_64_syscalls,
-    find_c_cpp_files,
-    syscall_hunter,
+    x86_64_syscall_ids,
+    analyse_file,
     searching_for_syscalls_in_headers,
-    header_hunter_lexer,
-    FOUND_SYSCALLS,
+    FILE_SECTIONS,
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -54,86 +60,91 @@ def execute_shell_locate_cmd(cmd):
     return results
 
 
-def convert_and_write_to_json(input_file_path, output_file_path):
+def file_identifier_hits(file_path, identifiers, source_cache=None, scan=None):
     """
-    Converts a text file containing Python dictionaries into a JSON file.
+    Finds the lines of a single file where each identifier is found, from the
+    scan of the file: identifiers in comments and string literals are ignored.
+    The file is scanned as bytes, so sources that are not valid UTF-8 are fine.
 
     Args:
-        input_file_path (str): The path to the input text file.
-        output_file_path (str): The path to the output JSON file.
-    """
-    try:
-        with open(input_file_path, "r") as file:
-            lines = file.readlines()
-        data = [eval(line.strip()) for line in lines]
-        converted_data = [(function, list(tags)) for function, tags in data]
-        result_dict = {function: tags for function, tags in converted_data}
-        json_data = json.dumps(result_dict, indent=2)
-        with open(output_file_path, "w") as output_file:
-            output_file.write(json_data)
-        print(f"Conversion successful. JSON data written to {output_file_path}")
-    except Exception as e:
-        print(f"Error: {str(e)}")
-
-
-def grep_exact(word_to_find, file_path):
-    """
-    Searches for an exact word in a file and returns the matching lines.
-
-    Args:
-        word_to_find (str): The word to search for.
-        file_path (str): The path to the file to search in.
+        file_path (str): The file to index.
+        identifiers (set): The identifiers to index, i.e the syscalls.
+        source_cache (SourceCache): The cache the file is read through, if any.
+        scan (SourceScan): The scan of the file, it is scanned here if None.
 
     Returns:
-        dict: A dictionary containing the line numbers as keys and the matching lines as values.
+        dict: identifier -> list of [line number, stripped line].
     """
-    result = {}
-    try:
-        with open(file_path, "r") as file:
-            for line_number, line in enumerate(file, 1):
-                # Exclude lines starting with " or /*
-                if (
-                    not line.strip().startswith('"')
-                    and not line.strip().startswith("/*")
-                    and not line.strip().startswith("*")
-                    and not line.strip().startswith("//")
-                ):
-                    if re.search(rf"\b{re.escape(word_to_find)}\b", line):
-                        result[line_number] = line.strip()
-    except FileNotFoundError:
-        print(f"File '{file_path}' not found.")
-
-    return result
-
-
-def find_line_number_in_c_cpp(c_cpp, syscall):
+    return line_hits(file_path, identifiers, source_cache, scan)
+
+
+def analyse_sources(
+    sources,
+    syscalls,
+    include_roots,
+    repo_path,
+    api=False,
+    sysroot_index=None,
+    manifest=None,
+    shared_pool=None,
+    source_options=None,
+):
     """
-    Searches for a syscall in C/C++ files and returns the line numbers where it is found.
+    Runs the per-file work units of a repository, across the shared process
+    pool of the run when one is given, in this process otherwise, and yields
+    their results in source order as they complete, so the reports do not
+    depend on scheduling and no more than the results of the units in flight
+    are held.
 
     Args:
-        c_cpp (set or str): A set of file paths or a single file path to search in.
-        syscall (str): The syscall to search for.
-
-    Returns:
-        dict: A dictionary containing the file names as keys and the matching lines as values.
+        sources (list): The source files of the repository.
+        syscalls (set): The syscall table.
+        include_roots (list): Ordered -I style include directories.
+        repo_path (str): The path to the repository.
+        api (bool): Also extract the identifiers for the API query.
+        sysroot_index (str): Path of a sysroot index seeding the include graphs.
+        manifest (RepoManifest): Reuses the results of unchanged files, if given.
+        shared_pool (SharedPool): The pool shared by the repositories of the run.
+        source_options (dict): Keyword arguments of the SourceCache every unit
+            reads its file through, i.e use_mmap.
+
+    Yields:
+        tuple: Each file path and the results of analyse_file, in source order.
     """
-    res = {}
-    if not c_cpp:
-        print("Not found")
-        return
-    if isinstance(c_cpp, set):
-        for file in c_cpp:
-            output = grep_exact(syscall, file)
-            if output:
-                result_str = f"{syscall} is found in file {file}"
-                res[result_str] = output
-
-    elif isinstance(c_cpp, set):
-        output = grep_exact(syscall, c_cpp)
-        if output:
-            result_str = f"{syscall} is found in file {c_cpp}"
-            res[result_str] = output
-    return res
+    sections = FILE_SECTIONS + (("api",) if api else ())
+    cached, pending = {}, []
+    for file_path in sources:
+        results = manifest.lookup(file_path, sections) if manifest else None
+        if results is None:
+            pending.append(file_path)
+        else:
+            cached[file_path] = results
+
+    unit = functools.partial(
+        analyse_file,
+        syscalls=frozenset(syscalls),
+        include_roots=include_roots,
+        repo_root=repo_path,
+        api=api,
+        sysroot_index=sysroot_index,
+        source_options=source_options,
+    )
+    if shared_pool is not None:
+        chunksize = max(1, len(pending) // (shared_pool.jobs * 8))
+        entries = shared_pool.map(unit, pending, chunksize=chunksize)
+    else:
+        entries = (unit(file_path) for file_path in pending)
+
+    for file_path in sources:
+        if file_path in cached:
+            yield file_path, cached.pop(file_path)
+            continue
+        entry = next(entries)
+        if entry is None:
+            continue
+        if manifest is not None:
+            manifest.store(file_path, entry)
+        yield file_path, entry["results"]
 
 
 def pretty_dots(sentence, num_dots):
@@ -208,7 +219,22 @@ def paths(output, repo_name):
     return path_header, path_syscall_perfile, path_find_lines, path_echo, path_api
 
 
-def repo_analyse(repo_name, mrepo, echo, dev_echo, output, compiler, api, version):
+def repo_analyse(
+    repo_name,
+    mrepo,
+    echo,
+    dev_echo,
+    output,
+    compiler,
+    api,
+    versions,
+    api_options=None,
+    source_options=None,
+    sys_options=None,
+    manifest_dir=None,
+    shared_pool=None,
+    matrix=None,
+):
     """
     Analyzes a repository.
 
@@ -220,6 +246,17 @@ def repo_analyse(repo_name, mrepo, echo, dev_echo, output, compiler, api, versio
         output (str): The path to the output directory.
         compiler (str): The compiler to use.
         api (bool): Flag indicating whether to run the API query.
+        versions (list): The versions of the API the API calls are resolved against.
+        api_options (dict): Keyword arguments forwarded to the API query, i.e cache_path, jobs, backend.
+        source_options (dict): Keyword arguments of the SourceCache of the work units, i.e use_mmap.
+        sys_options (dict): Options of the syscall analysis, i.e include_dirs searched
+            before compiler, header_cache_path, sysroot_index, text_reports,
+            result_store.
+        manifest_dir (str): Directory of the per-repo manifests, when given only the
+            files changed since the previous run are processed again.
+        shared_pool (SharedPool): The process pool shared by the repositories of
+            the run, the files are analysed in this process if None.
+        matrix (SyscallMatrix): Collects the syscalls of every file of the run, if given.
     """
     # Create output folder for the repository
     repo_output_folder = os.path.join(
@@ -231,27 +268,104 @@ def repo_analyse(repo_name, mrepo, echo, dev_echo, output, compiler, api, versio
     # Set the path to the repository
     repo_path = os.path.join(mrepo, repo_name)
 
-    # Set the paths for various files
-    (
-        path_header,
-        path_syscall_perfile,
-        path_find_lines,
-        path_echo,
-        path_api,
-    ) = utilities.paths(output, repo_name)
-    path_header = path_header.replace(" ", "_")
-    path_echo = path_echo.replace(" ", "_")
-    path_find_lines = path_find_lines.replace(" ", "_")
-    path_syscall_perfile = path_syscall_perfile.replace(" ", "_")
-    path_api = path_api.replace(" ", "_")
+    # Set the path of the API output, the other results are streamed by the ResultWriter
+    path_api = utilities.paths(output, repo_name)[4].replace(" ", "_")
 
     print(f"* Path of the repository being analysed {repo_path}.")
     if os.path.exists(repo_path):
+        # Discover the sources once, every stage is given the same list
+        sources = discover_sources(repo_path)
+        all_x86_64_syscalls = x86_64_syscalls()
+        sys_options = sys_options or {}
+        include_roots = list(sys_options.get("include_dirs", ())) + [compiler]
+
+        manifest = None
+        if manifest_dir:
+            # The per-file results do not depend on the versions of the API
+            context = {
+                "include_roots": [os.path.abspath(root) for root in include_roots],
+                "sysroot_index": sys_options.get("sysroot_index"),
+                "syscalls": sorted(all_x86_64_syscalls),
+            }
+            manifest = RepoManifest(
+                manifest_path(manifest_dir, repo_path), context
+            )
+
+        repo_name = os.path.basename(repo_path)
+        store = None
+        if sys_options.get("result_store"):
+            # One connection per repository, the threads of --t never share it
+            store = ResultStore(sys_options["result_store"])
+            store.begin(repo_name.replace(" ", "_"), repo_path)
+        writer = ResultWriter(
+            repo_output_folder, repo_name, sys_options.get("text_reports", True), store
+        )
+        symbol_cache = HeaderSymbolCache(
+            sys_options.get("header_cache_path", DEFAULT_INDEX_PATH)
+        )
+        index = None
+        if sys_options.get("sysroot_index"):
+            index = load_sysroot_index(sys_options["sysroot_index"])
+        reachable = None
+        if echo:
+            logger.info("Finding which syscalls every file reaches through its includes...")
+            reachable = ReachableSyscalls(
+                seeded_include_graph(include_roots, sys_options.get("sysroot_index")),
+                x86_64_syscall_ids(),
+                symbol_cache,
+                index,
+            )
+
+        # Every file is read, scanned and lexed once by its work unit, its
+        # records are written as soon as its results arrive
+        headers = set()
+        matrix_rows = {}
+        file_identifiers = {}
+        for file_path, results in analyse_sources(
+            sources,
+            all_x86_64_syscalls,
+            include_roots,
+            repo_path,
+            api,
+            sys_options.get("sysroot_index"),
+            manifest,
+            shared_pool,
+            source_options,
+        ):
+            headers.update(results["includes"])
+            matrix_rows[os.path.relpath(file_path, repo_path)] = results["syscalls"]
+            if api:
+                file_identifiers[file_path] = results["api"]
+            if reachable is not None:
+                writer.file_reachable_syscalls(
+                    file_path, reachable.file(results["headers"])
+                )
+            if dev_echo:
+                writer.file_line_hits(file_path, results["lines"])
+                sys.stdout.write(f"[  ] System calls found in the  {file_path}         ")
+                sys.stdout.flush()
+                writer.file_syscalls(file_path, set(results["syscalls"]))
+                sys.stdout.write(f"\r[OK] System calls found in the  {file_path} \n")
+                sys.stdout.flush()
+
+        if matrix is not None:
+            matrix.add_repo(repo_name, matrix_rows)
+
         print(f"api {api}")
         if api:
-            run_query_api(path_api, repo_output_folder, repo_path, version)
+            api_calls = run_query_api(
+                path_api,
+                repo_output_folder,
+                repo_path,
+                versions,
+                sources=sources,
+                file_identifiers=file_identifiers,
+                **(api_options or {}),
+            )
+            if store is not None:
+                for version, calls in api_calls.items():
+                    store.add_api_calls(writer.repo_name, calls, version)
 
-        repo_name = os.path.basename(repo_path)
         print(f"* Repository currently analysed {repo_path}.")
 
         # Fetch required information
@@ -259,12 +373,7 @@ def repo_analyse(repo_name, mrepo, echo, dev_echo, output, compiler, api, versio
         utilities.pretty_dots(
             f"* Creating {output} directory containing all the debuggin Information.", 3
         )
-        all_x86_64_syscalls, all_c_cpp_files = x86_64_syscalls(), find_c_cpp_files(
-            repo_path
-        )
-
-        headers = header_hunter_lexer(all_c_cpp_files)
-
+        all_c_cpp_files = set(sources)
         tmp_lst = []
 
         # Find C and CPP files
@@ -279,60 +388,37 @@ def repo_analyse(repo_name, mrepo, echo, dev_echo, output, compiler, api, versio
         pprint.pprint(tmp_lst)
 
         if echo:
-            tmp_lst = []
             logger.info("Finding which syscall is found in which header...")
 
-            with open(path_echo, "a") as file:
+            if index is None:
                 syscalls_headers_dict = searching_for_syscalls_in_headers(
-                    all_x86_64_syscalls, headers, compiler
+                    all_x86_64_syscalls, headers, include_roots, symbol_cache
                 )
-                pprint.pprint(syscalls_headers_dict, file)
-                print(f"os.system(mv {path_echo} {repo_output_folder}")
-                os.system(f"mv {path_echo} {repo_output_folder}")
+            else:
+                # Indexed sysroot headers are answered without reading them
+                indexed = {header for header in headers if index.covers(header)}
+                syscalls_headers_dict = index.syscalls_in_headers(
+                    all_x86_64_syscalls, indexed
+                )
+                for syscall, found_in in searching_for_syscalls_in_headers(
+                    all_x86_64_syscalls,
+                    headers - indexed,
+                    include_roots,
+                    symbol_cache,
+                ).items():
+                    syscalls_headers_dict.setdefault(syscall, set()).update(found_in)
+            writer.syscall_headers(syscalls_headers_dict)
 
         if dev_echo:
             logger.info("\r* Working hard, please be patient!")
-            tmp_lst = []
 
+            # The units index the whole syscall table, only the syscalls found
+            # in headers are looked up
             with click.progressbar(syscalls_headers_dict.keys()) as bar:
                 for key in bar:
-                    tmp_lst.append(
-                        utilities.find_line_number_in_c_cpp(all_c_cpp_files, key)
-                    )
-
-            with open(path_header, "w") as file:
-                pprint.pprint(headers, file)
-            print(f"os.system(mv {path_header} {repo_output_folder}")
-            os.system(f"mv {path_header} {repo_output_folder}")
-
-            for files in all_c_cpp_files:
-                syscall_hunter(all_x86_64_syscalls, files)
-                sys.stdout.write(f"[  ] System calls found in the  {files}         ")
-                sys.stdout.flush()
-                sys.stdout.write(f"\r[OK] System calls found in the  {files} \n")
-                sys.stdout.flush()
-                with open(path_syscall_perfile, "a") as file:
-                    file.write("\n")
-                    pprint.pprint(
-                        f"        #######################################################",
-                        file,
-                    )
-                    pprint.pprint(f"System calls found in the  {files}", file)
-                    pprint.pprint(
-                        f"""      ########################################################""",
-                        file,
-                    )
-                    file.write("\n")
-                    pprint.pprint(FOUND_SYSCALLS, file)
-                FOUND_SYSCALLS.clear()
-            print(f"os.system(mv {path_syscall_perfile} {repo_output_folder}")
-
-            os.system(f"mv {path_syscall_perfile} {repo_output_folder}")
-
-            with open(path_find_lines, "w") as file:
-                pprint.pprint(tmp_lst, file)
-            print(f"os.system(mv {path_find_lines} {repo_output_folder}")
-            os.system(f"mv {path_find_lines} {repo_output_folder}")
+                    writer.line_hits(key)
+
+            writer.headers(headers)
 
             logger.info(f"User information is saved in {repo_output_folder}")
             logger.info(
@@ -346,3 +432,13 @@ def repo_analyse(repo_name, mrepo, echo, dev_echo, output, compiler, api, versio
             )
         else:
             logger.error(f"No data found in {repo_path}")
+        writer.close()
+        logger.info(f"Results are streamed to {writer.path}")
+        if store is not None:
+            store.commit(writer.repo_name)
+            store.close()
+            logger.info(f"Results are stored in {sys_options['result_store']}")
+        if manifest is not None:
+            manifest.save()
+            logger.info(f"Manifest: {manifest.stats()}")
+        symbol_cache.close()